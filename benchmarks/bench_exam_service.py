@@ -0,0 +1,36 @@
+"""
+Leitura do banco de questões: cache quente, recarga e estruturas derivadas.
+"""
+from src.services.exam_service import get_questions, load_exam, question_bank
+from src.services.question_index import question_index
+from src.services.search_index import search_index
+
+YEAR = 2024
+
+
+def bench_load_exam_cached(benchmark):
+    load_exam(YEAR)
+    benchmark(load_exam, YEAR)
+
+
+def bench_load_exam_cold(benchmark):
+    def cold():
+        question_bank.clear()
+        return load_exam(YEAR)
+
+    benchmark(cold)
+
+
+def bench_get_questions_cached(benchmark):
+    get_questions(YEAR)
+    benchmark(get_questions, YEAR)
+
+
+def bench_search(benchmark):
+    search_index.search("Estatuto dos Militares")
+    benchmark(search_index.search, "Estatuto dos Militares")
+
+
+def bench_practice_exam(benchmark):
+    question_index.practice_exam(40)
+    benchmark(question_index.practice_exam, 40, ["LEGISLAÇÃO BÁSICA"], 2016, 2024, 1)
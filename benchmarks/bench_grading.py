@@ -0,0 +1,28 @@
+"""
+Correção de provas: uma submissão e um lote (vetorizado).
+"""
+import random
+
+from src.services import grading_service
+from src.services.exam_service import get_questions
+
+YEAR = 2024
+
+
+def _random_answers(rng: random.Random) -> dict[int, str]:
+    return {
+        question["numero"]: rng.choice("ABCD")
+        for question in get_questions(YEAR)
+        if rng.random() < 0.9
+    }
+
+
+def bench_grade_submission(benchmark):
+    answers = _random_answers(random.Random(0))
+    benchmark(grading_service.grade_submission, YEAR, answers)
+
+
+def bench_grade_submissions_batch_1000(benchmark):
+    rng = random.Random(0)
+    submissions = [_random_answers(rng) for _ in range(1000)]
+    benchmark(grading_service.grade_submissions, YEAR, submissions)
@@ -0,0 +1,33 @@
+"""
+Hash de senha (Argon2) e tokens JWT.
+"""
+from datetime import timedelta
+
+from fastapi import HTTPException
+
+from src.services.security import (
+    create_access_token,
+    hash_password,
+    verify_access_token,
+    verify_password,
+)
+
+PASSWORD = "senha12345"
+
+
+def bench_hash_password(benchmark):
+    benchmark(hash_password, PASSWORD)
+
+
+def bench_verify_password(benchmark):
+    hashed = hash_password(PASSWORD)
+    assert benchmark(verify_password, PASSWORD, hashed)
+
+
+def bench_create_access_token(benchmark):
+    benchmark(create_access_token, {"sub": "aluno1"}, timedelta(minutes=30))
+
+
+def bench_verify_access_token(benchmark):
+    token = create_access_token({"sub": "aluno1"}, timedelta(minutes=30))
+    benchmark(verify_access_token, token, HTTPException(status_code=401))
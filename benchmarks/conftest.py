@@ -0,0 +1,16 @@
+"""
+Configuração comum dos micro-benchmarks.
+
+Rode a partir da raiz do projeto:
+
+    python -m pytest -c benchmarks/pytest.ini benchmarks
+"""
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+# Os micro-benchmarks não usam o banco; evita depender do PostgreSQL local
+os.environ.setdefault("DATABASE_URL", "sqlite://")
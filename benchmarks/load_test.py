@@ -0,0 +1,348 @@
+"""
+Cenário de carga: uma turma faz login e resolve uma prova ao mesmo tempo.
+
+Cada aluno virtual:
+
+1. faz login (POST /auth/login);
+2. lê a prova página por página (GET /exams/{year}/questions);
+3. inicia a tentativa (POST /attempts/);
+4. responde cada questão com um POST /attempts/{id}/answers;
+5. finaliza a tentativa (POST /attempts/{id}/finish).
+
+Por padrão a API roda no próprio processo (httpx + ASGI) com um SQLite
+temporário; com --base-url o cenário roda contra um servidor já no ar
+(ex.: uvicorn com PostgreSQL local).
+
+No próprio processo, o pool de conexões e a fila do pool de hashing são
+dimensionados para --concurrency (DB_POOL_SIZE e PASSWORD_HASH_MAX_QUEUE;
+PASSWORD_HASH_WORKERS fica no número de CPUs), se não vierem do ambiente;
+valores do ambiente pequenos demais encerram o teste antes de começar.
+
+    python -m benchmarks.load_test --users 50 --output results.json
+    python -m benchmarks.load_test --base-url http://localhost:8000 --users 200
+    python -m benchmarks.load_test --compare results.json  # compara com uma execução anterior
+
+O relatório traz p50/p95/p99 e vazão por endpoint; o JSON gravado com
+--output inclui o commit atual para comparar execuções entre commits.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from pathlib import Path
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = "senha12345"
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """
+    Percentil por interpolação linear (valores já ordenados).
+    """
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+
+class Recorder:
+    """
+    Latências (s) e erros por endpoint.
+    """
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    async def call(self, name: str, client: httpx.AsyncClient, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        elapsed = time.perf_counter() - start
+        self.latencies.setdefault(name, []).append(elapsed)
+        if response is None or response.status_code >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return None
+        return response
+
+    def report(self, duration: float) -> dict:
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[name] = {
+                "requests": len(values),
+                "errors": self.errors.get(name, 0),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+                "rps": round(len(values) / duration, 1) if duration else 0.0,
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "duration_s": round(duration, 3),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "rps": round(total / duration, 1) if duration else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+async def student(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    username: str,
+    year: int,
+    page_size: int,
+    think_time: float,
+    rng: random.Random,
+) -> None:
+    response = await recorder.call(
+        "POST /auth/login", client, "POST", "/auth/login",
+        data={"username": username, "password": PASSWORD},
+    )
+    if response is None:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    numeros = []
+    page = 1
+    while True:
+        response = await recorder.call(
+            "GET /exams/{year}/questions", client, "GET", f"/exams/{year}/questions",
+            params={"page": page, "size": page_size}, headers=headers,
+        )
+        if response is None:
+            return
+        body = response.json()
+        numeros.extend(question["numero"] for question in body["questions"])
+        if page >= body["pages"]:
+            break
+        page += 1
+
+    response = await recorder.call(
+        "POST /attempts/", client, "POST", "/attempts/", json={"year": year}, headers=headers,
+    )
+    if response is None:
+        return
+    attempt_id = response.json()["id"]
+
+    for numero in numeros:
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, think_time))
+        await recorder.call(
+            "POST /attempts/{id}/answers", client, "POST", f"/attempts/{attempt_id}/answers",
+            json={"answers": {str(numero): rng.choice("ABCD")}}, headers=headers,
+        )
+
+    await recorder.call(
+        "POST /attempts/{id}/finish", client, "POST", f"/attempts/{attempt_id}/finish",
+        headers=headers,
+    )
+
+
+def size_in_process_pools(concurrency: int) -> dict:
+    """
+    Dimensiona, via variáveis de ambiente (lidas ao importar a API), o pool
+    de conexões e o pool de hashing para `concurrency` alunos simultâneos.
+    Retorna as configurações usadas (vão para o relatório).
+
+    Levanta:
+        SystemExit: se um valor definido no ambiente não comportar a concorrência.
+    """
+    # Cada requisição usa uma conexão; +1 para a gravação em lote das respostas
+    os.environ.setdefault("DB_POOL_SIZE", str(concurrency + 1))
+    os.environ.setdefault("DB_MAX_OVERFLOW", "0")
+    # Argon2 usa CPU: mais threads que núcleos não aumentam a vazão e tiram
+    # CPU do event loop; os logins excedentes esperam na fila
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", str(min(concurrency, os.cpu_count() or 1)))
+    os.environ.setdefault("PASSWORD_HASH_MAX_QUEUE", str(concurrency))
+    settings = {
+        name: int(os.environ[name])
+        for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "PASSWORD_HASH_WORKERS", "PASSWORD_HASH_MAX_QUEUE")
+    }
+
+    problems = []
+    if settings["DB_POOL_SIZE"] + settings["DB_MAX_OVERFLOW"] < concurrency + 1:
+        problems.append(f"DB_POOL_SIZE + DB_MAX_OVERFLOW precisa ser pelo menos {concurrency + 1}")
+    if settings["PASSWORD_HASH_MAX_QUEUE"] < concurrency:
+        problems.append(f"PASSWORD_HASH_MAX_QUEUE precisa ser pelo menos {concurrency}")
+    if problems:
+        raise SystemExit(
+            f"Configuração pequena demais para --concurrency {concurrency}: " + "; ".join(problems) + "."
+        )
+    return settings
+
+
+@asynccontextmanager
+async def in_process_client(users: list[str]):
+    """
+    API no próprio processo, com um SQLite temporário e os usuários já criados.
+    """
+    db_dir = tempfile.mkdtemp(prefix="cfs-load-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_dir}/load.db"
+    sys.path.insert(0, str(ROOT_DIR))
+
+    from src.api.main import app
+    from src.db.database import Base, SessionLocal, async_engine, engine
+    from src.db.models import User
+    from src.services.security import hash_password
+
+    Base.metadata.create_all(bind=engine)  # banco descartável: dispensa as migrações
+    with engine.connect() as conn:
+        # WAL: leituras não bloqueiam a escrita (sem isso, com uma conexão por
+        # aluno, escritas concorrentes esbarram em "database is locked")
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+    # Um único hash para todos: criar a turma não faz parte da medição
+    password_hash = hash_password(PASSWORD)
+    with SessionLocal() as db:
+        db.add_all(
+            User(
+                username=username,
+                email=f"{username}@example.com",
+                password_hash=password_hash,
+                full_name=f"Aluno {username}",
+                birth_date=date(2000, 1, 1),
+                role="aluno",
+            )
+            for username in users
+        )
+        db.commit()
+
+    try:
+        async with app.router.lifespan_context(app):
+            # Erros da API viram respostas 500 (contadas como erro), não exceções
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load.test") as client:
+                yield client
+    finally:
+        # Fecha as conexões (e a thread do aiosqlite) antes de o event loop terminar
+        await async_engine.dispose()
+
+
+@asynccontextmanager
+async def remote_client(base_url: str, users: list[str], concurrency: int):
+    """
+    Cliente para um servidor já no ar; cria os usuários que ainda não existem.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        for username in users:
+            await client.post("/users/", json={
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": PASSWORD,
+                "full_name": f"Aluno {username}",
+                "birth_date": "2000-01-01",
+                "role": "aluno",
+            })  # 400 se já existir: tudo bem
+        yield client
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    users = [f"{args.user_prefix}{i:05d}" for i in range(args.users)]
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+
+    if args.base_url:
+        pool_settings = None  # definidas no servidor
+        client_cm = remote_client(args.base_url, users, args.concurrency)
+    else:
+        pool_settings = size_in_process_pools(args.concurrency)
+        client_cm = in_process_client(users)
+
+    async with client_cm as client:
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def limited(username: str, student_rng: random.Random):
+            async with semaphore:
+                await student(client, recorder, username, args.year, args.page_size, args.think_time, student_rng)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            limited(username, random.Random(rng.random())) for username in users
+        ))
+        duration = time.perf_counter() - start
+
+    return {
+        "commit": current_commit(),
+        "target": args.base_url or "in-process (SQLite)",
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "pools": pool_settings,
+        "year": args.year,
+        **recorder.report(duration),
+    }
+
+
+def print_report(result: dict, baseline: dict | None = None) -> None:
+    print(
+        f"commit={result['commit']} target={result['target']} users={result['users']} "
+        f"concurrency={result['concurrency']} duration={result['duration_s']}s "
+        f"requests={result['requests']} errors={result['errors']} rps={result['rps']}"
+    )
+    if result.get("pools"):
+        print(" ".join(f"{name}={value}" for name, value in result["pools"].items()))
+    header = f"{'endpoint':<32}{'reqs':>7}{'errs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in result["endpoints"].items():
+        line = (
+            f"{name:<32}{stats['requests']:>7}{stats['errors']:>6}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['rps']:>9}"
+        )
+        old = (baseline or {}).get("endpoints", {}).get(name)
+        if old and old["p95_ms"]:
+            change = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+            line += f"   p95 {change:+.1f}% vs {baseline.get('commit')}"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Teste de carga: turma fazendo login e resolvendo uma prova.")
+    parser.add_argument("--base-url", help="URL de uma API já no ar (padrão: API no próprio processo com SQLite).")
+    parser.add_argument("--users", type=int, default=50, help="Alunos virtuais (padrão: 50).")
+    parser.add_argument("--concurrency", type=int, default=50, help="Alunos simultâneos (padrão: 50).")
+    parser.add_argument("--year", type=int, default=2024, help="Ano da prova (padrão: 2024).")
+    parser.add_argument("--page-size", type=int, default=10, help="Questões por página (padrão: 10).")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pausa máxima entre respostas, em segundos.")
+    parser.add_argument("--user-prefix", default="load", help="Prefixo dos usernames criados.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed das respostas sorteadas.")
+    parser.add_argument("--output", help="Grava o resultado em JSON.")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar o p95.")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args))
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(result, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Ambiente do Alembic: usa o engine síncrono da aplicação (DATABASE_URL) e os
+modelos registrados em Base.metadata.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from src.db import models  # noqa: F401  (registra os modelos no Base.metadata)
+from src.db.database import Base, engine
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """
+    Gera o SQL sem conectar ao banco (alembic upgrade head --sql).
+    """
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=engine.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",  # ALTER TABLE no SQLite
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
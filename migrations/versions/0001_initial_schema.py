@@ -0,0 +1,79 @@
+"""
+Esquema inicial: users, refresh_tokens, attempts e attempt_answers.
+
+Bancos criados antes das migrações (pelo antigo create_all) já têm essas
+tabelas: nesse caso basta marcá-los com `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(120), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("full_name", sa.String(120), nullable=False),
+        sa.Column("birth_date", sa.Date(), nullable=False),
+        sa.Column("role", sa.String(20), nullable=False),
+        sa.Column("rank", sa.String(50), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("jti", sa.String(64), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_refresh_tokens_id", "refresh_tokens", ["id"])
+    op.create_index("ix_refresh_tokens_jti", "refresh_tokens", ["jti"], unique=True)
+    op.create_index("ix_refresh_tokens_user_id", "refresh_tokens", ["user_id"])
+
+    op.create_table(
+        "attempts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_attempts_id", "attempts", ["id"])
+    op.create_index("ix_attempts_user_id_year", "attempts", ["user_id", "year"])
+
+    op.create_table(
+        "attempt_answers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("attempt_id", sa.Integer(), sa.ForeignKey("attempts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("question_numero", sa.Integer(), nullable=False),
+        sa.Column("chosen", sa.String(1), nullable=False),
+        sa.Column("is_correct", sa.Boolean(), nullable=False),
+        sa.Column("answered_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("attempt_id", "question_numero", name="uq_attempt_answers_attempt_question"),
+    )
+    op.create_index("ix_attempt_answers_id", "attempt_answers", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("attempt_answers")
+    op.drop_table("attempts")
+    op.drop_table("refresh_tokens")
+    op.drop_table("users")
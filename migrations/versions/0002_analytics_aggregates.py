@@ -0,0 +1,52 @@
+"""
+Agregados de análise: question_stats e user_discipline_stats.
+
+As tabelas começam vazias e passam a ser atualizadas a cada gravação de
+respostas. Para incluir as respostas gravadas antes desta migração, rode
+uma vez `python -m src.services.analytics_service`.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "question_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("question_numero", sa.Integer(), nullable=False),
+        sa.Column("answered", sa.Integer(), nullable=False),
+        sa.Column("correct", sa.Integer(), nullable=False),
+        sa.Column("chosen_a", sa.Integer(), nullable=False),
+        sa.Column("chosen_b", sa.Integer(), nullable=False),
+        sa.Column("chosen_c", sa.Integer(), nullable=False),
+        sa.Column("chosen_d", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("year", "question_numero", name="uq_question_stats_year_question"),
+    )
+    op.create_index("ix_question_stats_id", "question_stats", ["id"])
+
+    op.create_table(
+        "user_discipline_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("discipline", sa.String(120), nullable=False),
+        sa.Column("answered", sa.Integer(), nullable=False),
+        sa.Column("correct", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("user_id", "discipline", name="uq_user_discipline_stats_user_discipline"),
+    )
+    op.create_index("ix_user_discipline_stats_id", "user_discipline_stats", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("user_discipline_stats")
+    op.drop_table("question_stats")
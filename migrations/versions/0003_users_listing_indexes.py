@@ -0,0 +1,40 @@
+"""
+Índices da listagem de usuários: (role, id), (rank, id) e busca trigram.
+
+No PostgreSQL, os índices trigram precisam da extensão pg_trgm (criada aqui;
+exige permissão de CREATE no banco). Nos demais bancos viram índices comuns.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_role_id", "users", ["role", "id"])
+    op.create_index("ix_users_rank_id", "users", ["rank", "id"])
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_users_full_name_trgm", "users", ["full_name"],
+        postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_users_username_trgm", "users", ["username"],
+        postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_username_trgm", table_name="users")
+    op.drop_index("ix_users_full_name_trgm", table_name="users")
+    op.drop_index("ix_users_rank_id", table_name="users")
+    op.drop_index("ix_users_role_id", table_name="users")
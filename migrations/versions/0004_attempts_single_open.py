@@ -0,0 +1,39 @@
+"""
+Índice único parcial: no máximo uma tentativa em aberto por (usuário, ano).
+
+Tentativas em aberto duplicadas já existentes (criadas por requisições
+concorrentes) são finalizadas antes, mantendo apenas a mais recente.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE attempts SET finished_at = CURRENT_TIMESTAMP
+        WHERE finished_at IS NULL
+          AND id NOT IN (
+            SELECT MAX(id) FROM attempts WHERE finished_at IS NULL GROUP BY user_id, year
+          )
+        """
+    )
+    op.create_index(
+        "uq_attempts_open_user_year", "attempts", ["user_id", "year"], unique=True,
+        postgresql_where=sa.text("finished_at IS NULL"),
+        sqlite_where=sa.text("finished_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_attempts_open_user_year", table_name="attempts")
@@ -1,18 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 # Importar os routers que acabamos de criar
-from src.api.routes import auth, users
-from src.db.database import Base, engine # Importar Base e engine para criar as tabelas
+from src.api.middleware import MetricsMiddleware
+from src.api.routes import admin, analytics, attempts, auth, exams, users
+from src.services.attempt_service import answer_recorder
+from src.services.metrics import registry
+from src.services.readiness import readiness
+
+# As tabelas são criadas/atualizadas pelas migrações (`alembic upgrade head`),
+# não na importação: o worker sobe sem abrir conexão com o banco.
+
 
-# Criar as tabelas no banco de dados (se não existirem)
-# Isso é útil para desenvolvimento, em produção você pode usar migrações (Alembic)
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Gravação em lote das respostas: inicia com a API e grava o restante ao encerrar
+    await answer_recorder.start()
+    # Aquecimento em segundo plano: a API já responde, mas /ready só fica OK ao terminar
+    warm_task = asyncio.create_task(readiness.warm_up()) if readiness.warm_on_startup else None
+    yield
+    if warm_task is not None:
+        warm_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await warm_task
+    await answer_recorder.stop()
 
-app = FastAPI(title="CFS Online Exam API")
+
+app = FastAPI(title="CFS Online Exam API", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 # Incluir os routers na aplicação principal
 app.include_router(auth.router)
 app.include_router(users.router)
+app.include_router(exams.router)
+app.include_router(attempts.router)
+app.include_router(analytics.router)
+app.include_router(admin.router)
 
 
 @app.get("/health")
@@ -20,4 +46,22 @@ def health_check(): # Não precisamos mais do Depends(get_db) aqui
     """
     Endpoint simples de saúde da aplicação.
     """
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Prontidão do worker: banco respondendo, pool com conexões livres e
+    banco de questões aquecido. 503 enquanto alguma verificação falhar.
+    """
+    result = await readiness.check()
+    return JSONResponse(result, status_code=200 if result["ready"] else 503)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Métricas no formato texto do Prometheus (latência por rota, status,
+    requisições em andamento e tempo em queries/Argon2/JWT).
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
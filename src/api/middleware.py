@@ -0,0 +1,57 @@
+"""
+Middleware de métricas HTTP (exportadas em GET /metrics).
+
+Para cada requisição registra a duração, o status e quanto tempo foi gasto
+em cada operação interna (queries, Argon2, JWT), agrupando pelo template da
+rota ("/exams/{year}/questions") para não criar uma série por URL.
+"""
+import time
+
+from src.services.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUEST_SPAN,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_PROGRESS,
+    request_span_scope,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro: não bufferiza a resposta e mede até o último byte enviado.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method)
+        start = time.perf_counter()
+        try:
+            with request_span_scope() as spans:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec(method)
+
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            HTTP_REQUESTS.inc(method, path, str(status_code))
+            HTTP_REQUEST_DURATION.observe(elapsed, method, path)
+            for span, seconds in spans.items():
+                HTTP_REQUEST_SPAN.observe(seconds, method, path, span)
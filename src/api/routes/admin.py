@@ -0,0 +1,103 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.database import get_async_db, get_pool_stats
+from src.services import export_service
+from src.services.attempt_service import answer_recorder
+from src.services.auth import AdminUser
+from src.services.search_index import search_index
+from src.services.security import password_hasher_pool
+from src.services.token_cache import token_cache
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+)
+
+
+@router.get("/stats/password-hasher")
+def password_hasher_stats(current_admin: AdminUser):
+    """
+    Métricas do pool de hashing de senhas (Argon2).
+
+    - queue_wait: tempo que cada tarefa esperou na fila.
+    - hash_time: tempo efetivo de cálculo do Argon2.
+    - rejected: tarefas recusadas com 503 por fila cheia.
+    - Apenas 'admin' pode acessar.
+    """
+    return password_hasher_pool.stats()
+
+
+@router.get("/stats/token-cache")
+def token_cache_stats(current_admin: AdminUser):
+    """
+    Métricas do cache de tokens verificados (hits, misses, invalidações).
+    - Apenas 'admin' pode acessar.
+    """
+    return token_cache.stats()
+
+
+@router.get("/stats/db-pool")
+def db_pool_stats(current_admin: AdminUser):
+    """
+    Estado do pool de conexões deste worker.
+
+    - checked_out / overflow: conexões em uso / além do pool_size.
+    - checkout_wait: tempo esperando por uma conexão livre.
+    - timeouts: checkouts que estouraram DB_POOL_TIMEOUT.
+    - Apenas 'admin' pode acessar.
+    """
+    return get_pool_stats()
+
+
+@router.get("/stats/answer-recorder")
+def answer_recorder_stats(current_admin: AdminUser):
+    """
+    Métricas da gravação em lote das respostas (buffer, lotes, falhas).
+    - Apenas 'admin' pode acessar.
+    """
+    return answer_recorder.stats()
+
+
+@router.get("/stats/search-index")
+def search_index_stats(current_admin: AdminUser):
+    """
+    Tamanho do índice de busca, reconstruções e tempo das consultas.
+    - Apenas 'admin' pode acessar.
+    """
+    return search_index.stats()
+
+
+@router.get("/exports/results")
+async def export_results(
+    current_admin: AdminUser,
+    fmt: Literal["csv", "xlsx"] = Query(default="csv", alias="format"),
+    year: int | None = Query(default=None),
+    rank: str | None = Query(default=None),
+    include_unfinished: bool = Query(default=False),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Resultados das tentativas (uma linha por tentativa) em CSV ou XLSX.
+
+    - Filtros opcionais por ano da prova e `rank` do usuário (turma).
+    - Por padrão só tentativas finalizadas; `include_unfinished=true` inclui as em aberto.
+    - O arquivo é gerado em streaming a partir de um cursor no servidor.
+    - Apenas 'admin' pode acessar.
+    """
+    # Grava o buffer deste worker (na sessão da requisição); com vários
+    # workers, respostas ainda no buffer dos outros entram só após o próximo
+    # flush deles
+    await answer_recorder.flush(db)
+    filename = f"resultados_{year}.{fmt}" if year is not None else f"resultados.{fmt}"
+    chunks = export_service.export_chunks(
+        db, fmt, year=year, rank=rank, include_unfinished=include_unfinished
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=export_service.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
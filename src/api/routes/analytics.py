@@ -0,0 +1,73 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.database import get_async_db
+from src.schemas.analytics import DisciplineStatsList, QuestionStatsList
+from src.services import analytics_service
+from src.services import async_user_service as user_service
+from src.services.auth import AdminOrInstrutorUser
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"],
+)
+
+
+@router.get("/questions/{year}", response_model=QuestionStatsList)
+async def question_stats(
+    year: int,
+    current_user: AdminOrInstrutorUser,
+    discipline: str | None = Query(default=None),
+    order: Literal["numero", "difficulty"] = Query(default="numero"),
+    min_answered: int = Query(default=0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Dificuldade das questões da prova do ano: taxa de acerto e distribuição
+    das escolhas por alternativa (quais distratores mais atraem).
+
+    - `order=difficulty`: da menor para a maior taxa de acerto.
+    - `min_answered`: ignora questões com poucas respostas.
+    - Apenas 'admin' ou 'instrutor' podem acessar.
+    """
+    questions = await analytics_service.question_report(
+        db, year, discipline=discipline, order=order, min_answered=min_answered
+    )
+    if questions is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Prova do ano {year} não encontrada.",
+        )
+    return {"year": year, "order": order, "questions": questions}
+
+
+@router.get("/disciplines", response_model=DisciplineStatsList)
+async def discipline_stats(
+    current_user: AdminOrInstrutorUser,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Taxa de acerto por disciplina, somando todos os usuários.
+    - Apenas 'admin' ou 'instrutor' podem acessar.
+    """
+    return {"user_id": None, "disciplines": await analytics_service.discipline_report(db)}
+
+
+@router.get("/users/{user_id}/disciplines", response_model=DisciplineStatsList)
+async def user_discipline_stats(
+    user_id: int,
+    current_user: AdminOrInstrutorUser,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Taxa de acerto de um usuário em cada disciplina.
+    - Apenas 'admin' ou 'instrutor' podem acessar.
+    """
+    if await user_service.get_user_by_id(db, user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuário não encontrado.",
+        )
+    return {"user_id": user_id, "disciplines": await analytics_service.discipline_report(db, user_id)}
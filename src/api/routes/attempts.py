@@ -0,0 +1,141 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.database import get_async_db
+from src.db.models import Attempt
+from src.schemas.attempt import AttemptAnswersAccepted, AttemptAnswersCreate, AttemptRead, AttemptStart
+from src.schemas.roles import UserRole
+from src.services import attempt_service
+from src.services.attempt_service import RecorderFull
+from src.services.auth import get_current_user
+from src.services.exam_service import question_bank
+from src.services.token_cache import Principal
+
+router = APIRouter(
+    prefix="/attempts",
+    tags=["Attempts"],
+)
+
+
+async def _attempt_read(db: AsyncSession, attempt: Attempt) -> AttemptRead:
+    return AttemptRead(
+        id=attempt.id,
+        user_id=attempt.user_id,
+        year=attempt.year,
+        started_at=attempt.started_at,
+        finished_at=attempt.finished_at,
+        answers=await attempt_service.get_answers(db, attempt.id),
+    )
+
+
+async def _get_own_attempt(
+    db: AsyncSession,
+    attempt_id: int,
+    current_user: Principal,
+    allow_staff: bool = False,
+) -> Attempt:
+    """
+    Busca a tentativa garantindo que pertence ao usuário
+    (ou, se allow_staff, que ele é 'admin'/'instrutor').
+    """
+    attempt = await attempt_service.get_attempt(db, attempt_id)
+    if attempt is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tentativa não encontrada.",
+        )
+    is_staff = current_user.role in {UserRole.ADMIN.value, UserRole.INSTRUTOR.value}
+    if attempt.user_id != current_user.id and not (allow_staff and is_staff):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem permissão para acessar este recurso.",
+        )
+    return attempt
+
+
+@router.post("/", response_model=AttemptRead)
+async def start_attempt_endpoint(
+    attempt_in: AttemptStart,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Inicia uma tentativa da prova do ano, ou retoma a que estiver em aberto
+    (com as respostas já registradas).
+    """
+    if attempt_in.year not in question_bank.years():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Prova do ano {attempt_in.year} não encontrada.",
+        )
+    attempt = await attempt_service.start_attempt(db, current_user.id, attempt_in.year)
+    return await _attempt_read(db, attempt)
+
+
+@router.get("/{attempt_id}", response_model=AttemptRead)
+async def get_attempt_endpoint(
+    attempt_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Retorna a tentativa e suas respostas.
+    - O próprio aluno, 'admin' ou 'instrutor' podem acessar.
+    """
+    attempt = await _get_own_attempt(db, attempt_id, current_user, allow_staff=True)
+    return await _attempt_read(db, attempt)
+
+
+@router.post(
+    "/{attempt_id}/answers",
+    response_model=AttemptAnswersAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def record_answers_endpoint(
+    attempt_id: int,
+    answers_in: AttemptAnswersCreate,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Registra respostas da tentativa.
+
+    - As respostas entram em um buffer e são gravadas em lote em instantes
+      (por isso 202 Accepted); leituras da tentativa já as enxergam.
+    - Responde 503 se o buffer estiver cheio.
+    """
+    attempt = await _get_own_attempt(db, attempt_id, current_user)
+    if attempt.finished_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Tentativa já finalizada.",
+        )
+
+    try:
+        accepted = attempt_service.record_answers(attempt, answers_in.answers)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+    except RecorderFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor sobrecarregado. Tente novamente em instantes.",
+            headers={"Retry-After": "1"},
+        )
+    return {"accepted": accepted}
+
+
+@router.post("/{attempt_id}/finish", response_model=AttemptRead)
+async def finish_attempt_endpoint(
+    attempt_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Finaliza a tentativa; depois disso ela não aceita novas respostas.
+    """
+    attempt = await _get_own_attempt(db, attempt_id, current_user)
+    attempt = await attempt_service.finish_attempt(db, attempt)
+    return await _attempt_read(db, attempt)
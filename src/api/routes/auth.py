@@ -1,16 +1,23 @@
 # src/api/routes/auth.py
 
-from datetime import timedelta # Importar timedelta
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm # Importar OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.database import get_db
-from src.services import user_service
-from src.services.security import verify_password, create_access_token # Importar create_access_token
+from src.db.database import get_async_db
+from src.db.models import User
+from src.services import async_user_service as user_service
+from src.services import refresh_token_service
+from src.services.security import (
+    access_token_lifetime,
+    create_access_token, # Importar create_access_token
+    verify_password_async,
+)
+from src.services.token_cache import Principal, token_cache
 from src.schemas.user import UserLogin, UserLoginResponse
-from src.schemas.token import Token # Importar o novo schema Token (vamos criar em breve)
-from config.settings import ACCESS_TOKEN_EXPIRE_MINUTES # Importar o tempo de expiração
+from src.schemas.token import LoginResponse, RefreshResponse, Token, TokenRefresh
 
 router = APIRouter(
     prefix="/auth",
@@ -18,30 +25,120 @@ router = APIRouter(
 )
 
 
+async def _authenticate(form_data: OAuth2PasswordRequestForm, db: AsyncSession) -> User:
+    """
+    Busca o usuário pelo username e verifica a senha (Argon2) no pool de
+    hashing, sem bloquear o event loop. Levanta 401 se falhar.
+    """
+    user = await user_service.get_user_by_username(db, form_data.username) # Buscar por username
+    if not user or not await verify_password_async(form_data.password, user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciais inválidas.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+def _access_token(user: User) -> dict:
+    """
+    Gera o token de acesso (validade com jitter) e o coloca no cache de
+    `get_current_user`, para que a primeira requisição autenticada não
+    consulte o banco.
+    """
+    lifetime = access_token_lifetime()
+    access_token = create_access_token(data={"sub": user.username}, expires_delta=lifetime)
+    # Claims do token que acabamos de assinar (sem verificar de novo a assinatura)
+    claims = jwt.get_unverified_claims(access_token)
+    token_cache.put(access_token, claims, Principal.from_user(user))
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_at": datetime.fromtimestamp(claims["exp"], tz=timezone.utc),
+        "expires_in": int(lifetime.total_seconds()),
+    }
+
+
+async def _issue_tokens(db: AsyncSession, user: User) -> dict:
+    """
+    Token de acesso + um novo refresh token.
+    """
+    refresh_token, refresh_expires_at = await refresh_token_service.issue_refresh_token(db, user)
+    return {
+        **_access_token(user),
+        "refresh_token": refresh_token,
+        "refresh_expires_at": refresh_expires_at,
+    }
+
+
 # Vamos mudar o response_model para Token
 @router.post("/token", response_model=Token) # Mudar o path para /token e o response_model
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), # Usar OAuth2PasswordRequestForm
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Realiza login de um usuário com username e senha e retorna um token JWT.
 
     - Busca usuário pelo username.
-    - Verifica a senha usando verify_password.
-    - Se falhar, retorna 401 Unauthorized.
-    - Se der certo, gera um token JWT e o retorna.
+    - Verifica a senha (Argon2) no pool de hashing, sem bloquear o event loop.
+    - Se falhar, retorna 401 Unauthorized (ou 503 se o pool estiver saturado).
+    - Se der certo, gera um token JWT (e um refresh token) e o retorna.
     """
-    user = user_service.get_user_by_username(db, form_data.username) # Buscar por username
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await _authenticate(form_data, db)
+    return await _issue_tokens(db, user)
+
+
+@router.post("/login", response_model=LoginResponse)
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Igual a /auth/token, mas também devolve a expiração dos tokens e o perfil
+    do usuário (UserRead), dispensando a chamada a /users/me logo após o login.
+    """
+    user = await _authenticate(form_data, db)
+    tokens = await _issue_tokens(db, user)
+    return {**tokens, "user": user}
+
+
+@router.post("/refresh", response_model=RefreshResponse)
+async def refresh_access_token(
+    refresh_in: TokenRefresh,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Troca um refresh token válido por um novo token de acesso, sem senha.
+
+    - O refresh token enviado é revogado e um novo é devolvido (sessão deslizante).
+    - Retorna 401 se o refresh token for inválido, expirado ou revogado.
+    """
+    try:
+        user, refresh_token, refresh_expires_at = await refresh_token_service.rotate_refresh_token(
+            db, refresh_in.refresh_token
+        )
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Credenciais inválidas.",
+            detail=str(e),
             headers={"WWW-Authenticate": "Bearer"},
-        )
+        ) from e
+
+    return {
+        **_access_token(user),
+        "refresh_token": refresh_token,
+        "refresh_expires_at": refresh_expires_at,
+    }
 
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    refresh_in: TokenRefresh,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Revoga o refresh token. O token de acesso atual continua válido até expirar.
+    """
+    await refresh_token_service.revoke_refresh_token(db, refresh_in.refresh_token)
+    return None
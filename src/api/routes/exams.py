@@ -0,0 +1,201 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+
+from config.settings import QUESTIONS_PER_PAGE
+from src.schemas.exam import (
+    DisciplineList,
+    ExamQuestionPage,
+    ExamRead,
+    ExamYearList,
+    PracticeExam,
+    SearchResults,
+    SubmissionCreate,
+    SubmissionResult,
+)
+from src.schemas.roles import UserRole
+from src.services.auth import get_current_user
+from src.services import grading_service
+from src.services.exam_cache import CachedPayload, etag_matches, exam_payload_cache
+from src.services.question_index import question_index
+from src.services.search_index import search_index
+from src.services.token_cache import Principal
+
+router = APIRouter(
+    prefix="/exams",
+    tags=["Exams"],
+)
+
+
+def _can_see_answers(user: Principal) -> bool:
+    """
+    Apenas 'admin' e 'instrutor' recebem o gabarito.
+    """
+    return user.role in {UserRole.ADMIN.value, UserRole.INSTRUTOR.value}
+
+
+def _cached_response(payload: CachedPayload, if_none_match: str | None) -> Response:
+    """
+    Devolve o payload pré-serializado, ou 304 se o cliente já tiver essa versão.
+    """
+    headers = {
+        "ETag": payload.etag,
+        # O conteúdo depende do usuário (gabarito), então não pode ir para caches compartilhados
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+    }
+    if etag_matches(if_none_match, payload.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+
+def _exam_not_found(year: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Prova do ano {year} não encontrada.",
+    )
+
+
+@router.get("/years", response_model=ExamYearList)
+def list_exam_years(
+    current_user: Principal = Depends(get_current_user),
+    if_none_match: str | None = Header(default=None),
+):
+    """
+    Lista os anos de prova disponíveis e a quantidade de questões de cada um.
+    """
+    return _cached_response(exam_payload_cache.years(), if_none_match)
+
+
+@router.get("/disciplines", response_model=DisciplineList)
+def list_disciplines(
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Lista as disciplinas, com a quantidade de questões e os anos em que aparecem.
+    """
+    return {"disciplines": question_index.disciplines()}
+
+
+@router.get("/practice", response_model=PracticeExam)
+def get_practice_exam(
+    discipline: list[str] = Query(default=[]),
+    year_from: int | None = Query(default=None),
+    year_to: int | None = Query(default=None),
+    size: int = Query(default=40, ge=1, le=200),
+    seed: int | None = Query(default=None, ge=0),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Monta um simulado sorteando questões de várias provas.
+
+    - `discipline` pode ser repetido (?discipline=A&discipline=B).
+    - `year_from`/`year_to` limitam o intervalo de anos (inclusive).
+    - 'aluno' recebe as questões sem o gabarito.
+    """
+    if year_from is not None and year_to is not None and year_from > year_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="year_from deve ser menor ou igual a year_to.",
+        )
+
+    exam = question_index.practice_exam(
+        size, disciplines=discipline, year_from=year_from, year_to=year_to, seed=seed
+    )
+    if not _can_see_answers(current_user):
+        exam["questions"] = [
+            {k: v for k, v in question.items() if k != "gabarito"}
+            for question in exam["questions"]
+        ]
+    return exam
+
+
+@router.get("/search", response_model=SearchResults)
+def search_questions(
+    q: str = Query(min_length=1, max_length=200),
+    discipline: str | None = Query(default=None),
+    year: int | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Busca questões de todas as provas por palavras-chave
+    (enunciado e alternativas), ordenadas por relevância.
+
+    - Ignora acentos, maiúsculas e palavras comuns ("de", "dos", ...).
+    - Filtros opcionais por disciplina e ano.
+    - 'aluno' recebe as questões sem o gabarito.
+    """
+    total, hits = search_index.search(q, discipline=discipline, year=year, limit=limit)
+    include_answers = _can_see_answers(current_user)
+    results = []
+    for score, question in hits:
+        hit = dict(question, score=round(score, 4))
+        if not include_answers:
+            hit.pop("gabarito", None)
+        results.append(hit)
+    return {"query": q, "total": total, "hits": results}
+
+
+@router.get("/{year}", response_model=ExamRead)
+def get_exam(
+    year: int,
+    current_user: Principal = Depends(get_current_user),
+    if_none_match: str | None = Header(default=None),
+):
+    """
+    Retorna a prova completa do ano.
+
+    - 'aluno' recebe as questões sem o gabarito.
+    - Suporta If-None-Match (ETag) → 304 Not Modified.
+    """
+    payload = exam_payload_cache.exam(year, include_answers=_can_see_answers(current_user))
+    if payload is None:
+        raise _exam_not_found(year)
+    return _cached_response(payload, if_none_match)
+
+
+@router.get("/{year}/questions", response_model=ExamQuestionPage)
+def get_exam_questions_page(
+    year: int,
+    page: int = Query(default=1, ge=1),
+    size: int = Query(default=QUESTIONS_PER_PAGE, ge=1, le=100),
+    current_user: Principal = Depends(get_current_user),
+    if_none_match: str | None = Header(default=None),
+):
+    """
+    Retorna uma página (1-based) de questões da prova do ano.
+
+    - 'aluno' recebe as questões sem o gabarito.
+    - Suporta If-None-Match (ETag) → 304 Not Modified.
+    """
+    payload = exam_payload_cache.page(
+        year, page, size, include_answers=_can_see_answers(current_user)
+    )
+    if payload is None:
+        raise _exam_not_found(year)
+    return _cached_response(payload, if_none_match)
+
+
+@router.post("/{year}/submissions", response_model=SubmissionResult)
+def submit_exam(
+    year: int,
+    submission: SubmissionCreate,
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Corrige uma prova inteira de uma vez.
+
+    - Recebe {numero da questão: letra} e devolve total de acertos,
+      desempenho por disciplina e o resultado de cada questão.
+    - Questões anuladas contam como acerto.
+    """
+    try:
+        result = grading_service.grade_submission(year, submission.answers)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+    if result is None:
+        raise _exam_not_found(year)
+    return result
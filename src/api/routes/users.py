@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-from src.db.database import get_db
-from src.services import user_service
-from src.services.security import hash_password
-from src.schemas.user import UserCreate, UserRead, UserUpdate
+import codecs
+import json
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.database import get_async_db
+from src.services import async_user_service as user_service
+from src.services.security import hash_password_async
+from src.services import user_import
+from src.schemas.roles import UserRole
+from src.schemas.user import UserCreate, UserPage, UserRead, UserUpdate
 from src.services.auth import get_current_user, AdminOrInstrutorUser, AdminUser
-from src.db.models import User
+from src.services.token_cache import Principal, token_cache
 
 router = APIRouter(
     prefix="/users",
@@ -15,33 +21,24 @@ router = APIRouter(
 
 
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def create_user_endpoint(
+async def create_user_endpoint(
     user_in: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    if user_in.username and user_in.username.strip():
-        username_final = user_in.username.strip()
-    else:
-        username_final = user_in.email.split("@")[0]
+    username_final = user_in.username  # já derivado do email, se vazio (UserCreate)
 
-    existing_user_by_username = user_service.get_user_by_username(db, username_final)
-    if existing_user_by_username:
+    # Uma única consulta verifica username e email antes do hash (caro) da senha
+    conflicts = await user_service.find_conflicts(db, username=username_final, email=user_in.email)
+    if conflicts:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username já está em uso.",
+            detail=user_service.conflict_message(conflicts),
         )
 
-    existing_user_by_email = user_service.get_user_by_email(db, user_in.email)
-    if existing_user_by_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email já está em uso.",
-        )
-
-    password_hashed = hash_password(user_in.password)
+    password_hashed = await hash_password_async(user_in.password)
 
     try:
-        user = user_service.create_user(
+        user = await user_service.create_user(
             db,
             username=username_final,
             email=user_in.email,
@@ -59,25 +56,110 @@ def create_user_endpoint(
         ) from e
 
 
+@router.get("/", response_model=UserPage)
+async def list_users_endpoint(
+    current_user: AdminOrInstrutorUser,
+    role: UserRole | None = Query(default=None),
+    rank: str | None = Query(default=None, max_length=50),
+    q: str | None = Query(default=None, min_length=1, max_length=120),
+    after: int | None = Query(default=None, ge=0, description="Último id da página anterior."),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Lista usuários em ordem de id, com paginação por chave.
+
+    - Filtros opcionais: role, rank (turma) e q (trecho do nome ou username).
+    - Use `next_after` da resposta como `after` para a próxima página.
+    - Apenas 'admin' ou 'instrutor' podem acessar.
+    """
+    users = await user_service.list_users(
+        db,
+        role=role.value if role is not None else None,
+        rank=rank,
+        q=q,
+        after=after,
+        limit=limit + 1,  # um a mais para saber se há próxima página
+    )
+    next_after = users[limit - 1].id if len(users) > limit else None
+    return {"users": users[:limit], "next_after": next_after}
+
+
+@router.post("/bulk")
+async def bulk_create_users_endpoint(
+    current_admin: AdminUser,
+    file: UploadFile = File(..., description="Arquivo CSV (com cabeçalho) ou JSONL."),
+    fmt: str | None = Query(default=None, alias="format", pattern="^(csv|jsonl)$"),
+    chunk_size: int = Query(default=user_import.DEFAULT_CHUNK_SIZE, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Cadastra usuários em lote a partir de um arquivo CSV ou JSONL.
+
+    - Apenas 'admin' pode acessar.
+    - Colunas/campos: email, username, full_name, birth_date, role, rank, password
+      (role padrão: 'aluno'; username vazio é derivado do email).
+    - Cada bloco de linhas é validado, checado contra o banco em uma consulta,
+      tem as senhas com hash em paralelo e é inserido em um único INSERT.
+    - A resposta é transmitida em NDJSON: uma linha de resultado por linha do
+      arquivo, seguida de um resumo.
+    """
+    fmt = fmt or user_import.detect_format(file.filename, file.content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato não reconhecido. Envie .csv ou .jsonl, ou informe ?format=.",
+        )
+
+    # Lê o upload em streaming (utf-8, aceitando BOM do Excel); import_users
+    # consome as linhas em blocos numa thread, fora do event loop
+    stream = codecs.getreader("utf-8-sig")(file.file, errors="replace")
+    rows = user_import.read_rows(stream, fmt)
+
+    async def report():
+        async for result in user_import.import_users(db, rows, chunk_size=chunk_size):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(report(), media_type="application/x-ndjson")
+
+
 @router.get("/me", response_model=UserRead)
 async def get_current_user_endpoint(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return current_user
+    """
+    Perfil completo do usuário autenticado (em cache no `token_cache` até o
+    usuário ser alterado ou seus tokens saírem do cache).
+    """
+    profile = token_cache.get_profile(current_user.id)
+    if profile is not None:
+        return profile
+
+    generation = token_cache.generation()
+    user = await user_service.get_user_by_id(db, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuário não encontrado.",
+        )
+    profile = UserRead.model_validate(user)
+    token_cache.put_profile(current_user.id, profile, generation)
+    return profile
 
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user_by_id_endpoint(
+async def get_user_by_id_endpoint(
     user_id: int,
     current_user: AdminOrInstrutorUser,  # sem default, vem antes
-    db: Session = Depends(get_db),       # com default, vem depois
+    db: AsyncSession = Depends(get_async_db),       # com default, vem depois
 ):
     """
     Busca um usuário pelo seu ID.
 
     - Apenas 'admin' ou 'instrutor' podem acessar.
     """
-    user = user_service.get_user_by_id(db, user_id)
+    user = await user_service.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -88,24 +170,26 @@ def get_user_by_id_endpoint(
 @router.patch("/me", response_model=UserRead)
 async def update_current_user_endpoint(
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Atualiza os próprios dados do usuário autenticado.
     - Não permite alterar 'role' nem 'id'.
     - Se 'password' for enviado, atualiza a senha (com hash).
     """
-    # Se o payload incluir password, fazemos o hash e atualizamos aqui
+    # Se o payload incluir password, fazemos o hash aqui e o service grava
+    # (revogando os refresh tokens na mesma transação)
+    new_hashed_password = None
     if user_update.password is not None:
-        new_hashed_password = hash_password(user_update.password)
-        current_user.password_hash = new_hashed_password
+        new_hashed_password = await hash_password_async(user_update.password)
 
     try:
-        updated_user = user_service.update_user(
+        updated_user = await user_service.update_user(
             db=db,
             user_id=current_user.id,
             user_update=user_update,
+            password_hash=new_hashed_password,
         )
     except ValueError as e:
         # Conflito de email/username
@@ -124,10 +208,10 @@ async def update_current_user_endpoint(
     return updated_user
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user_endpoint(
+async def delete_user_endpoint(
     user_id: int,
     current_admin: AdminUser,  # ← sem "= Depends()"
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 
 ):
     """
@@ -136,7 +220,7 @@ def delete_user_endpoint(
     - Apenas usuários com role 'admin' podem acessar.
     - Retorna 204 em caso de sucesso.
     """
-    deleted = user_service.delete_user(db, user_id)
+    deleted = await user_service.delete_user(db, user_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
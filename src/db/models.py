@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, Date, DateTime, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.sql import func
 
 from .database import Base
@@ -6,6 +6,20 @@ from .database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Listagem paginada por id (GET /users/) filtrando por role/rank
+        Index("ix_users_role_id", "role", "id"),
+        Index("ix_users_rank_id", "rank", "id"),
+        # Busca por trecho do nome/username (ILIKE); GIN trigram no PostgreSQL
+        Index(
+            "ix_users_full_name_trgm", "full_name",
+            postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_users_username_trgm", "username",
+            postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), nullable=False, unique=True, index=True)
@@ -15,4 +29,98 @@ class User(Base):
     birth_date = Column(Date, nullable=False)
     role = Column(String(20), nullable=False)
     rank = Column(String(50), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class RefreshToken(Base):
+    """
+    Refresh token emitido no login. Guardamos só o identificador (jti) para
+    poder revogá-lo no servidor; o token em si é um JWT assinado.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class Attempt(Base):
+    """
+    Uma tentativa de resolução da prova de um ano por um usuário.
+    """
+    __tablename__ = "attempts"
+    __table_args__ = (
+        Index("ix_attempts_user_id_year", "user_id", "year"),
+        # No máximo uma tentativa em aberto por (usuário, ano)
+        Index(
+            "uq_attempts_open_user_year", "user_id", "year", unique=True,
+            postgresql_where=text("finished_at IS NULL"),
+            sqlite_where=text("finished_at IS NULL"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    year = Column(Integer, nullable=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class AttemptAnswer(Base):
+    """
+    Resposta atual de uma questão dentro de uma tentativa
+    (uma linha por questão; novas escolhas sobrescrevem a anterior).
+    """
+    __tablename__ = "attempt_answers"
+    __table_args__ = (
+        UniqueConstraint("attempt_id", "question_numero", name="uq_attempt_answers_attempt_question"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    attempt_id = Column(Integer, ForeignKey("attempts.id", ondelete="CASCADE"), nullable=False)
+    question_numero = Column(Integer, nullable=False)
+    chosen = Column(String(1), nullable=False)
+    is_correct = Column(Boolean, nullable=False)
+    answered_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class QuestionStats(Base):
+    """
+    Agregados de uma questão (ano, número), atualizados a cada gravação de
+    respostas: quantos responderam, quantos acertaram e quantos escolheram
+    cada alternativa.
+    """
+    __tablename__ = "question_stats"
+    __table_args__ = (
+        UniqueConstraint("year", "question_numero", name="uq_question_stats_year_question"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    year = Column(Integer, nullable=False)
+    question_numero = Column(Integer, nullable=False)
+    answered = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    chosen_a = Column(Integer, nullable=False, default=0)
+    chosen_b = Column(Integer, nullable=False, default=0)
+    chosen_c = Column(Integer, nullable=False, default=0)
+    chosen_d = Column(Integer, nullable=False, default=0)
+
+
+class UserDisciplineStats(Base):
+    """
+    Questões respondidas e acertadas por um usuário em uma disciplina
+    (chave canônica, ver `discipline_key`), somando todas as tentativas.
+    """
+    __tablename__ = "user_discipline_stats"
+    __table_args__ = (
+        UniqueConstraint("user_id", "discipline", name="uq_user_discipline_stats_user_discipline"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    discipline = Column(String(120), nullable=False)
+    answered = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,53 @@
+"""
+Importa usuários em lote a partir de um arquivo CSV ou JSONL.
+
+Uso (a partir da raiz do projeto):
+
+    python -m src.import_users alunos.csv
+    python -m src.import_users alunos.jsonl --chunk-size 1000 > relatorio.jsonl
+
+O relatório (uma linha JSON por linha do arquivo) vai para a saída padrão;
+o resumo final também é exibido na saída de erro.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from src.db.database import AsyncSessionLocal, async_engine
+from src.services import user_import
+
+
+async def run(path: str, fmt: str, chunk_size: int) -> dict:
+    summary = {}
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = user_import.read_rows(f, fmt)
+        async with AsyncSessionLocal() as db:
+            async for result in user_import.import_users(db, rows, chunk_size=chunk_size):
+                print(json.dumps(result, ensure_ascii=False))
+                summary = result.get("summary", summary)
+    await async_engine.dispose()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa usuários em lote (CSV ou JSONL).")
+    parser.add_argument("path", help="Arquivo .csv (com cabeçalho) ou .jsonl")
+    parser.add_argument("--format", choices=user_import.SUPPORTED_FORMATS, help="Força o formato do arquivo")
+    parser.add_argument("--chunk-size", type=int, default=user_import.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or user_import.detect_format(args.path)
+    if fmt is None:
+        parser.error("Não foi possível detectar o formato; use --format csv|jsonl.")
+
+    summary = asyncio.run(run(args.path, fmt, args.chunk_size))
+    print(
+        f"Importação concluída: {summary.get('created', 0)} criados, "
+        f"{summary.get('errors', 0)} com erro.",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
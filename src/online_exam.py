@@ -3,18 +3,26 @@ CFS Online Exam System - Main Application
 Streamlit interface integrated with FastAPI backend
 """
 import streamlit as st
-import pandas as pd
 import requests
 from datetime import date
-
-from src.services.exam_service import load_exam
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import (
+    API_BASE_URL,
+    API_MAX_RETRIES,
+    API_POOL_MAXSIZE,
+    API_RETRY_BACKOFF,
+    API_TIMEOUT_SECONDS,
+    QUESTIONS_PER_PAGE,
+)
+from src.services.exam_pages import exam_pages, format_question
+from src.services.exam_service import get_questions
 
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
 
-API_BASE_URL = "http://localhost:8000"  # Ajuste se a API estiver em outra porta/host
-
 # Page configuration
 st.set_page_config(
     page_title="CFS Online Exam",
@@ -37,55 +45,144 @@ if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
 if 'access_token' not in st.session_state:
     st.session_state.access_token = None
+if 'refresh_token' not in st.session_state:
+    st.session_state.refresh_token = None
 if 'current_user' not in st.session_state:
     st.session_state.current_user = None
+if 'attempts' not in st.session_state:
+    st.session_state.attempts = {}  # ano -> id da tentativa na API
 
 # ============================================================================
 # API INTEGRATION FUNCTIONS
 # ============================================================================
 
-def api_login(username: str, password: str) -> tuple[str, str]:
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """
+    Sessão HTTP compartilhada por todas as sessões do Streamlit (cache_resource).
+
+    Reaproveita conexões (keep-alive) em vez de abrir uma conexão TCP por
+    chamada e repete automaticamente falhas de conexão e respostas 502/503/504
+    (respeitando Retry-After), com backoff exponencial.
+
+    Falhas de leitura e respostas 502/503/504 só são repetidas em métodos
+    idempotentes (GET, PUT, DELETE...): um POST como login, refresh ou
+    finalizar tentativa pode já ter sido processado pela API. Falhas de
+    conexão (a requisição nem chegou a ser enviada) são repetidas sempre.
     """
-    Faz login na API FastAPI usando OAuth2PasswordRequestForm.
+    retry = Retry(
+        total=API_MAX_RETRIES,
+        backoff_factor=API_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,  # sem POST
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _api_request(
+    method: str,
+    path: str,
+    access_token: str | None = None,
+    error_message: str = "Erro na API.",
+    **kwargs,
+) -> dict:
+    """
+    Chamada à API pela sessão compartilhada; levanta ValueError com a mensagem de erro.
+    """
+    url = f"{API_BASE_URL}{path}"
+    headers = kwargs.pop("headers", {})
+    if access_token:
+        headers["Authorization"] = f"Bearer {access_token}"
+
+    try:
+        response = get_http_session().request(
+            method, url, headers=headers, timeout=API_TIMEOUT_SECONDS, **kwargs
+        )
+
+        # Token de acesso expirado: renova com o refresh token e repete uma vez
+        if response.status_code == 401 and access_token and refresh_session():
+            headers["Authorization"] = f"Bearer {st.session_state.access_token}"
+            response = get_http_session().request(
+                method, url, headers=headers, timeout=API_TIMEOUT_SECONDS, **kwargs
+            )
+
+        if response.status_code >= 400:
+            # Tenta extrair mensagem amigável da API
+            try:
+                detail = response.json().get("detail", error_message)
+            except Exception:
+                detail = f"{error_message} Status code: {response.status_code}"
+            raise ValueError(detail)
+
+        return response.json()
+
+    except requests.exceptions.ConnectionError:
+        raise ValueError("Não foi possível conectar à API. Verifique se o servidor está rodando.")
+    except requests.exceptions.Timeout:
+        raise ValueError("Tempo de conexão esgotado. Tente novamente.")
+    except requests.exceptions.RequestException as e:
+        raise ValueError(f"Erro na requisição: {str(e)}")
+
+
+def refresh_session() -> bool:
+    """
+    Obtém um novo token de acesso via /auth/refresh (sem pedir a senha de novo)
+    e atualiza a sessão. Retorna False se não houver refresh token válido.
+    """
+    refresh_token = st.session_state.get("refresh_token")
+    if not refresh_token:
+        return False
+    try:
+        # POST: não é repetido após falha de leitura ou 502/503/504, pois a
+        # API pode já ter rotacionado (e invalidado) o refresh token enviado
+        response = get_http_session().post(
+            f"{API_BASE_URL}/auth/refresh",
+            json={"refresh_token": refresh_token},
+            timeout=API_TIMEOUT_SECONDS,
+        )
+    except requests.exceptions.RequestException:
+        return False
+    if response.status_code == 401:
+        # Só descarta o refresh token quando a API o recusou; outras falhas
+        # (ex.: 503) mantêm a sessão para uma nova tentativa depois
+        st.session_state.refresh_token = None
+        return False
+    if response.status_code != 200:
+        return False
+
+    token_data = response.json()
+    st.session_state.access_token = token_data["access_token"]
+    st.session_state.refresh_token = token_data.get("refresh_token")
+    return True
+
+
+def api_login(username: str, password: str) -> dict:
+    """
+    Faz login na API FastAPI usando OAuth2PasswordRequestForm
+    (/auth/login: token e perfil do usuário em uma só requisição).
     
     Args:
         username: Nome de usuário
         password: Senha do usuário
     
     Returns:
-        Tupla (access_token, token_type)
+        Resposta do login: access_token, token_type e, se a API enviar,
+        o perfil do usuário em "user"
     
     Raises:
         ValueError: Se as credenciais forem inválidas ou houver erro na API
     """
-    url = f"{API_BASE_URL}/auth/token"
     data = {
         "username": username,
         "password": password,
     }
     # OAuth2PasswordRequestForm espera application/x-www-form-urlencoded
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-
-    try:
-        response = requests.post(url, data=data, headers=headers, timeout=10)
-        
-        if response.status_code != 200:
-            # Tenta extrair mensagem amigável da API
-            try:
-                detail = response.json().get("detail", "Erro ao autenticar.")
-            except Exception:
-                detail = f"Erro ao autenticar. Status code: {response.status_code}"
-            raise ValueError(detail)
-
-        token_data = response.json()
-        return token_data["access_token"], token_data.get("token_type", "bearer")
-    
-    except requests.exceptions.ConnectionError:
-        raise ValueError("Não foi possível conectar à API. Verifique se o servidor está rodando.")
-    except requests.exceptions.Timeout:
-        raise ValueError("Tempo de conexão esgotado. Tente novamente.")
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Erro na requisição: {str(e)}")
+    return _api_request("POST", "/auth/login", data=data, error_message="Erro ao autenticar.")
 
 
 def api_get_current_user(access_token: str) -> dict:
@@ -101,57 +198,84 @@ def api_get_current_user(access_token: str) -> dict:
     Raises:
         ValueError: Se o token for inválido ou houver erro na API
     """
-    url = f"{API_BASE_URL}/users/me"
-    headers = {
-        "Authorization": f"Bearer {access_token}"
-    }
-    
+    return _api_request("GET", "/users/me", access_token, error_message="Erro ao obter usuário atual.")
+
+
+def api_start_attempt(access_token: str, year: int) -> dict:
+    """
+    Inicia (ou retoma) a tentativa do ano. Retorna a tentativa com as
+    respostas já registradas ({"id": ..., "answers": {"1": "A", ...}}).
+    """
+    return _api_request("POST", "/attempts/", access_token, json={"year": year})
+
+
+def api_record_answer(access_token: str, attempt_id: int, numero: int, letter: str) -> None:
+    """
+    Registra a resposta de uma questão na tentativa.
+    """
+    _api_request(
+        "POST",
+        f"/attempts/{attempt_id}/answers",
+        access_token,
+        json={"answers": {str(numero): letter}},
+    )
+
+
+def api_finish_attempt(access_token: str, attempt_id: int) -> None:
+    """
+    Finaliza a tentativa (a próxima chamada a api_start_attempt cria outra).
+    """
+    _api_request("POST", f"/attempts/{attempt_id}/finish", access_token)
+
+
+def restore_attempt(year: int) -> int | None:
+    """
+    Garante uma tentativa na API para o ano e, na primeira vez nesta sessão,
+    restaura em st.session_state.answers as respostas já gravadas.
+    Falhas de rede não impedem o uso da prova (as respostas ficam só locais).
+    """
+    if year in st.session_state.attempts:
+        return st.session_state.attempts[year]
+
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        
-        if response.status_code != 200:
-            try:
-                detail = response.json().get("detail", "Erro ao obter usuário atual.")
-            except Exception:
-                detail = f"Erro ao obter usuário atual. Status code: {response.status_code}"
-            raise ValueError(detail)
+        attempt = api_start_attempt(st.session_state.access_token, year)
+    except ValueError as e:
+        st.toast(f"⚠️ Respostas não serão salvas: {e}")
+        return None
 
-        return response.json()
-    
-    except requests.exceptions.ConnectionError:
-        raise ValueError("Não foi possível conectar à API. Verifique se o servidor está rodando.")
-    except requests.exceptions.Timeout:
-        raise ValueError("Tempo de conexão esgotado. Tente novamente.")
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Erro na requisição: {str(e)}")
+    saved = {int(numero): letter for numero, letter in attempt.get("answers", {}).items()}
+    for question in get_questions(year):
+        letter = saved.get(question["numero"])
+        if letter in question["alternativas"]:
+            question = format_question(question)
+            st.session_state.answers[question["key"]] = f"{letter}) {question['alternativas'][letter]}"
+
+    st.session_state.attempts[year] = attempt["id"]
+    return attempt["id"]
 
 
 # ============================================================================
 # EXAM DISPLAY FUNCTIONS
 # ============================================================================
 
-def display_question(question: pd.Series, idx: int):
+def display_question(question: dict, idx: int, attempt_id: int | None = None):
     """
     Display a question with its alternatives and verification button
     
     Args:
-        question: Pandas Series contendo os dados da questão
+        question: Questão formatada (ver exam_pages.format_question)
         idx: Índice da questão
+        attempt_id: Tentativa na API onde a resposta é registrada (opcional)
     """
-    st.markdown(f"### Questão {question['numero']} - {question.get('disciplina', 'N/A')}")
+    st.markdown(f"### Questão {question['numero']} - {question['disciplina'] or 'N/A'}")
     st.markdown(f"**{question['enunciado']}**")
     st.markdown("---")
     
-    key = f"q_{question['ano']}_{question['numero']}"
-    answer_key = str(question.get('gabarito', '')).strip().upper()
+    key = question['key']
+    answer_key = question['gabarito']
     
-    # Answer options
-    letters = ['A', 'B', 'C', 'D']
-    options = []
-    for letter in letters:
-        col_name = f"alternativa_{letter.lower()}"
-        if col_name in question and pd.notna(question[col_name]):
-            options.append(f"{letter}) {question[col_name]}")
+    # Answer options (já formatadas: "A) texto")
+    options = list(question['options'])
     
     if not options:
         st.warning("⚠️ Questão sem alternativas disponíveis.")
@@ -167,6 +291,17 @@ def display_question(question: pd.Series, idx: int):
     
     if answer:
         st.session_state.answers[key] = answer
+        # Só envia à API quando a escolha muda (não a cada rerun)
+        if attempt_id is not None and answer != current_answer:
+            try:
+                api_record_answer(
+                    st.session_state.access_token,
+                    attempt_id,
+                    question['numero'],
+                    answer.split(")")[0],
+                )
+            except ValueError as e:
+                st.toast(f"⚠️ Resposta não foi salva: {e}")
     
     # Button to verify answer
     if st.button("✅ Verificar Resposta", key=f"verify_{key}"):
@@ -225,13 +360,16 @@ def show_login_page():
             with st.spinner("Autenticando..."):
                 try:
                     # Faz login na API
-                    access_token, token_type = api_login(username, password)
+                    token_data = api_login(username, password)
+                    access_token = token_data["access_token"]
                     
-                    # Guarda o token na sessão
+                    # Guarda os tokens na sessão
                     st.session_state.access_token = access_token
+                    st.session_state.refresh_token = token_data.get("refresh_token")
 
-                    # Busca dados do usuário logado
-                    current_user = api_get_current_user(access_token)
+                    # Dados do usuário logado: vêm junto com o token quando a
+                    # API os envia; senão, busca em /users/me
+                    current_user = token_data.get("user") or api_get_current_user(access_token)
                     st.session_state.current_user = current_user
 
                     # Marca como logado
@@ -280,10 +418,17 @@ def show_exam_page():
     if st.sidebar.button("🚪 Sair", use_container_width=True):
         # Limpa toda a sessão
         st.session_state.logged_in = False
+        if st.session_state.refresh_token:
+            try:
+                _api_request("POST", "/auth/logout", json={"refresh_token": st.session_state.refresh_token})
+            except ValueError:
+                pass
         st.session_state.access_token = None
+        st.session_state.refresh_token = None
         st.session_state.current_user = None
         st.session_state.answers = {}
         st.session_state.verified = {}
+        st.session_state.attempts = {}
         st.session_state.current_page = 0
         st.success("Logout realizado com sucesso!")
         st.rerun()
@@ -309,7 +454,7 @@ def show_exam_page():
     # LOAD EXAM DATA
     # ========================================================================
     try:
-        df_exam = load_exam(selected_year)
+        total_questions = exam_pages.total(selected_year)
     except FileNotFoundError:
         st.error(f"❌ Prova do ano {selected_year} não encontrada.")
         st.info("💡 Verifique se o arquivo CSV existe no diretório `data/`.")
@@ -318,15 +463,17 @@ def show_exam_page():
         st.error(f"❌ Erro ao carregar a prova: {str(e)}")
         return
     
-    if df_exam is None or df_exam.empty:
+    if total_questions == 0:
         st.error("❌ Não foi possível carregar a prova selecionada.")
         return
+
+    # Tentativa na API: as respostas sobrevivem a um refresh do navegador
+    attempt_id = restore_attempt(selected_year)
     
     # ========================================================================
     # PAGINATION SETUP
     # ========================================================================
-    total_questions = len(df_exam)
-    questions_per_page = 10
+    questions_per_page = QUESTIONS_PER_PAGE
     total_pages = (total_questions + questions_per_page - 1) // questions_per_page
     
     # Sidebar info
@@ -351,9 +498,12 @@ def show_exam_page():
     st.markdown(f"**Ano da prova:** {selected_year}")
     st.markdown("---")
     
-    for idx in range(start, end):
-        question = df_exam.iloc[idx]
-        display_question(question, idx)
+    # Só as questões desta página; a próxima é preparada em segundo plano
+    page_questions = exam_pages.get_page(selected_year, st.session_state.current_page, questions_per_page)
+    exam_pages.prefetch(selected_year, st.session_state.current_page + 1, questions_per_page)
+
+    for idx, question in enumerate(page_questions, start=start):
+        display_question(question, idx, attempt_id)
     
     # ========================================================================
     # NAVIGATION
@@ -386,6 +536,13 @@ def show_exam_page():
     st.sidebar.markdown("### 🔄 Ações")
     
     if st.sidebar.button("🗑️ Limpar todas as respostas", use_container_width=True):
+        # Encerra a tentativa atual; a próxima começa sem respostas
+        if attempt_id is not None:
+            try:
+                api_finish_attempt(st.session_state.access_token, attempt_id)
+            except ValueError:
+                pass
+        st.session_state.attempts.pop(selected_year, None)
         st.session_state.answers = {}
         st.session_state.verified = {}
         st.session_state.current_page = 0
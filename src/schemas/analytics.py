@@ -0,0 +1,42 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class QuestionStats(BaseModel):
+    """
+    Desempenho em uma questão: respostas, acertos e quantas vezes cada
+    alternativa (A–D) foi escolhida. correct_rate é None sem respostas.
+    """
+    ano: int
+    numero: int
+    disciplina: str | None = None
+    gabarito: str
+    answered: int
+    correct: int
+    correct_rate: float | None = None
+    distribution: dict[str, int]
+
+
+class QuestionStatsList(BaseModel):
+    year: int
+    order: Literal["numero", "difficulty"]
+    questions: list[QuestionStats]
+
+
+class DisciplineStats(BaseModel):
+    """
+    Respostas e acertos em uma disciplina, somando todas as tentativas.
+    """
+    disciplina: str
+    answered: int
+    correct: int
+    correct_rate: float | None = None
+
+
+class DisciplineStatsList(BaseModel):
+    """
+    Desempenho por disciplina de um usuário (ou de todos, se user_id for None).
+    """
+    user_id: int | None = None
+    disciplines: list[DisciplineStats]
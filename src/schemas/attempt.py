@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class AttemptStart(BaseModel):
+    """
+    Ano da prova a iniciar (ou retomar, se houver tentativa em aberto).
+    """
+    year: int
+
+
+class AttemptRead(BaseModel):
+    """
+    Tentativa com as respostas atuais (número da questão -> letra).
+    """
+    id: int
+    user_id: int
+    year: int
+    started_at: datetime
+    finished_at: datetime | None = None
+    answers: dict[int, str] = {}
+
+
+class AttemptAnswersCreate(BaseModel):
+    """
+    Respostas a registrar: número da questão -> letra escolhida (A–D).
+    """
+    answers: dict[int, str]
+
+
+class AttemptAnswersAccepted(BaseModel):
+    accepted: int
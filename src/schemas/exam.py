@@ -0,0 +1,106 @@
+from pydantic import BaseModel
+
+
+class ExamYear(BaseModel):
+    """
+    Ano de prova disponível e quantidade de questões.
+    """
+    year: int
+    questions: int
+
+
+class ExamYearList(BaseModel):
+    years: list[ExamYear]
+
+
+class ExamQuestion(BaseModel):
+    """
+    Questão de prova. O gabarito só é enviado para 'admin' e 'instrutor'.
+    """
+    ano: int
+    numero: int
+    disciplina: str | None = None
+    enunciado: str
+    alternativas: dict[str, str]
+    gabarito: str | None = None
+
+
+class ExamRead(BaseModel):
+    year: int
+    total: int
+    questions: list[ExamQuestion]
+
+
+class ExamQuestionPage(BaseModel):
+    year: int
+    page: int
+    size: int
+    total: int
+    pages: int
+    questions: list[ExamQuestion]
+
+
+class DisciplineInfo(BaseModel):
+    disciplina: str
+    questions: int
+    years: list[int]
+
+
+class DisciplineList(BaseModel):
+    disciplines: list[DisciplineInfo]
+
+
+class PracticeExam(BaseModel):
+    """
+    Simulado montado a partir de várias provas.
+    Reenvie o mesmo `seed` (com os mesmos filtros) para obter as mesmas questões.
+    """
+    seed: int
+    available: int
+    total: int
+    questions: list[ExamQuestion]
+
+
+class SearchHit(ExamQuestion):
+    """
+    Questão encontrada pela busca, com a relevância (BM25).
+    """
+    score: float
+
+
+class SearchResults(BaseModel):
+    query: str
+    total: int
+    hits: list[SearchHit]
+
+
+class SubmissionCreate(BaseModel):
+    """
+    Respostas de uma prova: número da questão -> letra escolhida (A–D).
+    Questões não respondidas podem ser omitidas.
+    """
+    answers: dict[int, str]
+
+
+class DisciplineScore(BaseModel):
+    disciplina: str
+    total: int
+    answered: int
+    correct: int
+
+
+class QuestionResult(BaseModel):
+    numero: int
+    chosen: str | None = None
+    correct: bool
+
+
+class SubmissionResult(BaseModel):
+    year: int
+    total_questions: int
+    answered: int
+    correct: int
+    annulled: int
+    score: float
+    disciplines: list[DisciplineScore]
+    questions: list[QuestionResult]
@@ -1,7 +1,11 @@
 # src/schemas/token.py
 
+from datetime import datetime
+
 from pydantic import BaseModel
 
+from src.schemas.user import UserRead
+
 
 class Token(BaseModel):
     """
@@ -9,6 +13,32 @@ class Token(BaseModel):
     """
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+
+class TokenRefresh(BaseModel):
+    """
+    Corpo de /auth/refresh e /auth/logout.
+    """
+    refresh_token: str
+
+
+class RefreshResponse(Token):
+    """
+    Resposta de /auth/refresh: novo token de acesso e novo refresh token
+    (o refresh token enviado deixa de valer).
+    """
+    expires_at: datetime
+    expires_in: int  # segundos
+    refresh_expires_at: datetime
+
+
+class LoginResponse(RefreshResponse):
+    """
+    Resposta de /auth/login: os tokens, quando expiram e o perfil do
+    usuário, para que o cliente não precise chamar /users/me em seguida.
+    """
+    user: UserRead
 
 
 class TokenData(BaseModel):
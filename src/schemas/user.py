@@ -1,6 +1,6 @@
 from typing import Optional
 from datetime import date
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from src.schemas.roles import UserRole
 
 
@@ -28,6 +28,25 @@ class UserCreate(UserBase):
     """
     password: str = Field(..., min_length=8, max_length=128)
 
+    @model_validator(mode="before")
+    @classmethod
+    def resolve_username(cls, data):
+        """
+        Username final do cadastro: o informado (sem espaços nas pontas) ou,
+        se vazio, a parte do email antes do "@". Resolvido antes da validação
+        dos campos, para que o username derivado também respeite 3 a 50
+        caracteres.
+        """
+        if not isinstance(data, dict):
+            return data
+        username = data.get("username")
+        email = data.get("email")
+        if isinstance(username, str) and username.strip():
+            return {**data, "username": username.strip()}
+        if isinstance(email, str):
+            return {**data, "username": email.split("@")[0]}
+        return data
+
 
 class UserRead(UserBase):
     """
@@ -72,4 +91,12 @@ class UserUpdate(BaseModel):
     full_name: Optional[str] = None
     birth_date: Optional[date] = None
     rank: Optional[str] = None
-    password: Optional[str] = Field(default=None, min_length=8, max_length=128)
\ No newline at end of file
+    password: Optional[str] = Field(default=None, min_length=8, max_length=128)
+
+class UserPage(BaseModel):
+    """
+    Página da listagem de usuários. Para a próxima página, repita a
+    consulta com `after=next_after` (None quando não há mais usuários).
+    """
+    users: list[UserRead]
+    next_after: int | None = None
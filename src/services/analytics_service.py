@@ -0,0 +1,267 @@
+"""
+Análise de desempenho: dificuldade de cada questão e acertos por disciplina.
+
+Os agregados (tabelas question_stats e user_discipline_stats) são mantidos
+de forma incremental: a cada lote gravado pelo AnswerRecorder,
+`apply_answer_events` desconta a escolha anterior de cada questão (se
+houver) e soma a nova, na mesma transação do lote. As consultas leem os
+agregados prontos, sem GROUP BY sobre todas as respostas.
+
+`rebuild_aggregates` recalcula tudo a partir de attempt_answers (para
+bancos com respostas gravadas antes dos agregados existirem):
+
+    python -m src.services.analytics_service
+"""
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import ANSWER_OPTIONS
+from src.db.database import dialect_insert
+from src.db.models import Attempt, AttemptAnswer, QuestionStats, UserDisciplineStats
+from src.services.exam_service import question_bank
+from src.services.question_index import question_index
+from src.services.text_utils import discipline_key
+
+LETTER_COLUMNS = {letter: f"chosen_{letter.lower()}" for letter in ANSWER_OPTIONS}
+QUESTION_COLUMNS = ["answered", "correct", *LETTER_COLUMNS.values()]
+DISCIPLINE_COLUMNS = ["answered", "correct"]
+
+
+def increment_statement(dialect_name: str, model, index_elements: list[str], columns: list[str]):
+    """
+    INSERT ... ON CONFLICT (index_elements) DO UPDATE SET col = col + excluded.col.
+    """
+    stmt = dialect_insert(dialect_name)(model)
+    table = model.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: table.c[column] + stmt.excluded[column] for column in columns},
+    )
+
+
+class _Deltas:
+    """
+    Variações dos agregados de um lote, somadas por linha de destino
+    (o upsert não pode tocar a mesma linha duas vezes no mesmo comando).
+    """
+
+    def __init__(self):
+        self.questions: dict[tuple[int, int], dict[str, int]] = {}
+        self.disciplines: dict[tuple[int, str], dict[str, int]] = {}
+
+    def add(
+        self,
+        user_id: int,
+        year: int,
+        numero: int,
+        discipline: str,
+        chosen: str,
+        is_correct: bool,
+        previous: tuple[str, bool] | None = None,
+    ) -> None:
+        if previous == (chosen, is_correct):
+            return
+        question = self.questions.setdefault((year, numero), dict.fromkeys(QUESTION_COLUMNS, 0))
+        per_user = self.disciplines.setdefault((user_id, discipline), dict.fromkeys(DISCIPLINE_COLUMNS, 0))
+        if previous is None:
+            question["answered"] += 1
+            per_user["answered"] += 1
+        else:
+            old_chosen, old_correct = previous
+            question[LETTER_COLUMNS[old_chosen]] -= 1
+            question["correct"] -= int(old_correct)
+            per_user["correct"] -= int(old_correct)
+        question[LETTER_COLUMNS[chosen]] += 1
+        question["correct"] += int(is_correct)
+        per_user["correct"] += int(is_correct)
+
+    async def write(self, db: AsyncSession) -> None:
+        dialect_name = db.bind.dialect.name
+        if self.questions:
+            await db.execute(
+                increment_statement(dialect_name, QuestionStats, ["year", "question_numero"], QUESTION_COLUMNS),
+                [
+                    {"year": year, "question_numero": numero, **values}
+                    for (year, numero), values in sorted(self.questions.items())
+                ],
+            )
+        if self.disciplines:
+            await db.execute(
+                increment_statement(dialect_name, UserDisciplineStats, ["user_id", "discipline"], DISCIPLINE_COLUMNS),
+                [
+                    {"user_id": user_id, "discipline": discipline, **values}
+                    for (user_id, discipline), values in sorted(self.disciplines.items())
+                ],
+            )
+
+
+async def _previous_answers(db: AsyncSession, events) -> dict[tuple[int, int], tuple[str, bool]]:
+    """
+    Respostas já gravadas das questões do lote ((attempt_id, numero) -> (letra, acerto)).
+    """
+    attempt_ids = sorted({event.attempt_id for event in events})
+    if db.bind.dialect.name == "postgresql":
+        # Trava as tentativas (não as respostas, que podem ainda não existir):
+        # outro worker gravando a mesma tentativa espera este commit e então
+        # enxerga as respostas deste lote como anteriores. Ordenado por id
+        # para não haver deadlock entre lotes. No SQLite a escrita já é serial.
+        await db.execute(
+            select(Attempt.id).where(Attempt.id.in_(attempt_ids)).order_by(Attempt.id).with_for_update()
+        )
+    stmt = select(
+        AttemptAnswer.attempt_id, AttemptAnswer.question_numero, AttemptAnswer.chosen, AttemptAnswer.is_correct,
+    ).where(AttemptAnswer.attempt_id.in_(attempt_ids))
+    wanted = {event.key for event in events}
+    result = await db.execute(stmt)
+    return {
+        (attempt_id, numero): (chosen, is_correct)
+        for attempt_id, numero, chosen, is_correct in result.all()
+        if (attempt_id, numero) in wanted
+    }
+
+
+async def apply_answer_events(db: AsyncSession, events) -> None:
+    """
+    Atualiza os agregados com um lote de respostas (AnswerEvent), antes de
+    o lote ser gravado em attempt_answers. Não faz commit.
+    """
+    if not events:
+        return
+    previous = await _previous_answers(db, events)
+    deltas = _Deltas()
+    for event in events:
+        deltas.add(
+            event.user_id, event.year, event.question_numero, event.discipline,
+            event.chosen, event.is_correct, previous.get(event.key),
+        )
+    await deltas.write(db)
+
+
+async def rebuild_aggregates(db: AsyncSession) -> int:
+    """
+    Recalcula os agregados a partir de todas as respostas gravadas.
+    Retorna o número de respostas processadas. Não faz commit.
+    """
+    disciplines: dict[int, dict[int, str]] = {}
+    deltas = _Deltas()
+    processed = 0
+    result = await db.stream(
+        select(
+            Attempt.user_id, Attempt.year, AttemptAnswer.question_numero,
+            AttemptAnswer.chosen, AttemptAnswer.is_correct,
+        ).join(Attempt, Attempt.id == AttemptAnswer.attempt_id)
+    )
+    async for user_id, year, numero, chosen, is_correct in result:
+        by_numero = disciplines.get(year)
+        if by_numero is None:
+            by_numero = disciplines[year] = {
+                q["numero"]: discipline_key(q["disciplina"]) for q in question_bank.get_questions(year)
+            }
+        deltas.add(user_id, year, numero, by_numero.get(numero, ""), chosen, is_correct)
+        processed += 1
+
+    await db.execute(delete(QuestionStats))
+    await db.execute(delete(UserDisciplineStats))
+    await deltas.write(db)
+    return processed
+
+
+def _rate(correct: int, answered: int) -> float | None:
+    return round(correct / answered, 4) if answered else None
+
+
+async def question_report(
+    db: AsyncSession,
+    year: int,
+    discipline: str | None = None,
+    order: str = "numero",
+    min_answered: int = 0,
+) -> list[dict] | None:
+    """
+    Questões do ano com respostas, acertos, taxa de acerto e quantas vezes
+    cada alternativa foi escolhida. Retorna None se o ano não existir.
+
+    order="difficulty" ordena da menor para a maior taxa de acerto
+    (questões sem respostas por último).
+    """
+    questions = question_bank.get_questions(year)
+    if not questions:
+        return None
+
+    result = await db.execute(select(QuestionStats).where(QuestionStats.year == year))
+    stats = {row.question_numero: row for row in result.scalars()}
+    wanted = discipline_key(discipline) if discipline else None
+
+    report = []
+    for question in questions:
+        if wanted is not None and discipline_key(question["disciplina"]) != wanted:
+            continue
+        row = stats.get(question["numero"])
+        answered = row.answered if row else 0
+        if answered < min_answered:
+            continue
+        correct = row.correct if row else 0
+        report.append({
+            "ano": question["ano"],
+            "numero": question["numero"],
+            "disciplina": question["disciplina"],
+            "gabarito": question["gabarito"],
+            "answered": answered,
+            "correct": correct,
+            "correct_rate": _rate(correct, answered),
+            "distribution": {
+                letter: getattr(row, column) if row else 0 for letter, column in LETTER_COLUMNS.items()
+            },
+        })
+
+    if order == "difficulty":
+        report.sort(key=lambda item: (item["correct_rate"] is None, item["correct_rate"] or 0.0, item["numero"]))
+    return report
+
+
+async def discipline_report(db: AsyncSession, user_id: int | None = None) -> list[dict]:
+    """
+    Respostas, acertos e taxa de acerto por disciplina: de um usuário ou,
+    se `user_id` for None, de todos os usuários somados.
+    """
+    if user_id is None:
+        stmt = select(
+            UserDisciplineStats.discipline,
+            func.sum(UserDisciplineStats.answered),
+            func.sum(UserDisciplineStats.correct),
+        ).group_by(UserDisciplineStats.discipline)
+    else:
+        stmt = select(
+            UserDisciplineStats.discipline, UserDisciplineStats.answered, UserDisciplineStats.correct,
+        ).where(UserDisciplineStats.user_id == user_id)
+
+    result = await db.execute(stmt)
+    report = [
+        {
+            "disciplina": question_index.discipline_name(key),
+            "answered": int(answered),
+            "correct": int(correct),
+            "correct_rate": _rate(int(correct), int(answered)),
+        }
+        for key, answered, correct in result.all()
+        if answered
+    ]
+    return sorted(report, key=lambda item: item["disciplina"])
+
+
+async def _main() -> None:
+    from src.db.database import AsyncSessionLocal, async_engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            processed = await rebuild_aggregates(db)
+            await db.commit()
+        print(f"Agregados recalculados a partir de {processed} respostas.")
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    asyncio.run(_main())
@@ -0,0 +1,196 @@
+# src/services/async_user_service.py
+"""
+Versão assíncrona de `user_service`, usada pelas rotas da API.
+
+As funções têm os mesmos nomes, parâmetros e comportamento das versões
+síncronas, mas recebem uma AsyncSession e precisam ser aguardadas.
+`user_service` continua disponível para scripts (ex.: src/test_db.py).
+"""
+from datetime import date
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import User
+from src.schemas.user import UserUpdate
+from src.services import refresh_token_service
+from src.services.token_cache import Principal, token_cache
+from src.services.user_service import (
+    conflict_message,
+    conflicting_columns,
+    delete_user_statement,
+    list_users_query,
+    principal_query,
+    update_user_statement,
+)
+
+
+async def create_user(
+    db: AsyncSession,
+    *,
+    username: str,
+    email: str,
+    password_hash: str,
+    full_name: str,
+    birth_date: date,
+    role: str,
+    rank: str | None = None,
+) -> User:
+    """
+    Cria um novo usuário no banco.
+
+    Levanta:
+        ValueError: se username ou email já estiverem cadastrados.
+    """
+    user = User(
+        username=username,
+        email=email,
+        password_hash=password_hash,
+        full_name=full_name,
+        birth_date=birth_date,
+        role=role,
+        rank=rank,
+    )
+
+    db.add(user)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        # Violação de UNIQUE: descobre qual coluna conflitou (só neste caso raro)
+        conflicts = await find_conflicts(db, username=username, email=email)
+        raise ValueError(conflict_message(conflicts)) from e
+
+    await db.refresh(user)  # Atualiza com dados do banco (id, created_at, etc.)
+    return user
+
+
+async def find_conflicts(db: AsyncSession, *, username: str, email: str) -> set[str]:
+    """
+    Verifica, em uma única consulta indexada, se username e/ou email já estão
+    cadastrados. Retorna o subconjunto de {"username", "email"} em uso.
+    """
+    result = await db.execute(
+        select(User.username, User.email)
+        .where(or_(User.username == username, User.email == email))
+        .limit(2)  # no máximo uma linha por coluna UNIQUE
+    )
+    return conflicting_columns(result.all(), username=username, email=email)
+
+
+async def find_existing(
+    db: AsyncSession, *, usernames: set[str], emails: set[str]
+) -> tuple[set[str], set[str]]:
+    """
+    Versão em lote de find_conflicts: em uma única consulta, retorna quais
+    dos usernames e emails informados já estão cadastrados.
+    """
+    if not usernames and not emails:
+        return set(), set()
+    result = await db.execute(
+        select(User.username, User.email).where(
+            or_(User.username.in_(usernames), User.email.in_(emails))
+        )
+    )
+    taken_usernames, taken_emails = set(), set()
+    for existing_username, existing_email in result.all():
+        if existing_username in usernames:
+            taken_usernames.add(existing_username)
+        if existing_email in emails:
+            taken_emails.add(existing_email)
+    return taken_usernames, taken_emails
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> User | None:
+    """
+    Busca um usuário pelo username.
+    Retorna o User ou None se não existir.
+    """
+    result = await db.execute(select(User).where(User.username == username).limit(1))
+    return result.scalars().first()
+
+
+async def get_principal_by_username(db: AsyncSession, username: str) -> Principal | None:
+    """
+    Busca o usuário pelo username sem carregar a entidade completa.
+    Retorna um Principal ou None se não existir.
+    """
+    row = (await db.execute(principal_query(username))).first()
+    return Principal.from_user(row) if row is not None else None
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+    """
+    Busca um usuário pelo email.
+    Retorna o User ou None se não existir.
+    """
+    result = await db.execute(select(User).where(User.email == email).limit(1))
+    return result.scalars().first()
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
+    """
+    Busca um usuário pelo seu ID.
+    """
+    return await db.get(User, user_id)
+
+
+async def list_users(db: AsyncSession, **filters) -> list[User]:
+    """
+    Uma página de usuários (ver `user_service.list_users_query` para os filtros).
+    """
+    result = await db.execute(list_users_query(**filters))
+    return list(result.scalars())
+
+
+async def update_user(
+    db: AsyncSession,
+    user_id: int,
+    user_update: UserUpdate,
+    password_hash: str | None = None,
+) -> User | None:
+    """
+    Atualiza parcialmente os dados de um usuário em um único UPDATE ... RETURNING.
+
+    A senha em texto puro de `user_update` é ignorada: o endpoint gera o hash
+    e o passa em `password_hash`. Com senha nova, os refresh tokens do usuário
+    são revogados na mesma transação (sessões abertas precisam logar de novo).
+    Retorna o usuário atualizado ou None se não encontrado.
+    """
+    stmt = update_user_statement(user_id, user_update, password_hash)
+    if stmt is None:
+        return await get_user_by_id(db, user_id)
+
+    try:
+        result = await db.execute(stmt)
+        user = result.scalars().first()
+        if user is not None and password_hash is not None:
+            await refresh_token_service.revoke_user_refresh_tokens(db, user_id, commit=False)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        # Provavelmente conflito de email/username já existente
+        raise ValueError("Email ou username já estão em uso.") from e
+
+    if user is not None:
+        token_cache.invalidate_user(user_id)
+    return user
+
+
+async def delete_user(db: AsyncSession, user_id: int) -> bool:
+    """
+    Deleta um usuário do banco de dados pelo ID (um único DELETE ... RETURNING).
+
+    Returns:
+        True se o usuário foi deletado, False se não foi encontrado
+    """
+    result = await db.execute(delete_user_statement(user_id))
+    deleted_id = result.scalar()
+    await db.commit()
+
+    if deleted_id is None:
+        return False
+
+    token_cache.invalidate_user(user_id)
+    return True
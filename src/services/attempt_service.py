@@ -0,0 +1,363 @@
+"""
+Tentativas de prova e gravação das respostas.
+
+As respostas não são gravadas uma a uma: `AnswerRecorder` guarda os eventos
+em memória (a última escolha de cada questão vence) e os grava em lote, num
+único INSERT ... ON CONFLICT DO UPDATE, a cada ANSWER_FLUSH_INTERVAL_SECONDS
+ou assim que o buffer atinge ANSWER_FLUSH_MAX_BATCH respostas.
+"""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import (
+    ANSWER_BUFFER_MAX,
+    ANSWER_FLUSH_INTERVAL_SECONDS,
+    ANSWER_FLUSH_MAX_BATCH,
+    ANSWER_OPTIONS,
+)
+from src.db.database import AsyncSessionLocal, dialect_insert
+from src.db.models import Attempt, AttemptAnswer
+from src.services import analytics_service, grading_service
+from src.services.metrics import TimingStats
+
+logger = logging.getLogger(__name__)
+
+
+class RecorderFull(Exception):
+    """
+    Levantada quando o buffer de respostas está cheio (banco fora do ar ou lento).
+    """
+
+
+@dataclass(frozen=True, slots=True)
+class AnswerEvent:
+    attempt_id: int
+    question_numero: int
+    chosen: str
+    is_correct: bool
+    answered_at: datetime
+    # Usados pelos agregados de análise (ver analytics_service)
+    user_id: int
+    year: int
+    discipline: str
+
+    @property
+    def key(self) -> tuple[int, int]:
+        return self.attempt_id, self.question_numero
+
+
+def upsert_statement(dialect_name: str, model, index_elements: list[str], update_columns: list[str]):
+    """
+    INSERT ... ON CONFLICT (index_elements) DO UPDATE para PostgreSQL ou SQLite.
+    """
+    stmt = dialect_insert(dialect_name)(model)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
+
+
+class AnswerRecorder:
+    """
+    Buffer de respostas com gravação em lote (write-behind).
+
+    `record` é chamado pelas rotas e apenas atualiza o buffer; uma tarefa em
+    segundo plano (iniciada com `start`) grava o buffer periodicamente.
+    `stop` grava o que restar antes de encerrar.
+    """
+
+    def __init__(self, session_factory, flush_interval: float, max_batch: int, max_buffer: int):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_buffer = max_buffer
+        self._lock = threading.Lock()
+        self._buffer: dict[tuple[int, int], AnswerEvent] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.events = 0
+        self.batches = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.flush_time = TimingStats()
+
+    def record(self, event: AnswerEvent) -> None:
+        """
+        Coloca a resposta no buffer (sobrescrevendo uma escolha anterior
+        ainda não gravada da mesma questão).
+
+        Levanta:
+            RecorderFull: se o buffer atingiu o limite.
+        """
+        self.record_many([event])
+
+    def record_many(self, events: list[AnswerEvent]) -> None:
+        """
+        Coloca um lote de respostas no buffer: todas ou nenhuma.
+
+        Levanta:
+            RecorderFull: se o lote inteiro não couber no buffer (nada é gravado).
+        """
+        with self._lock:
+            new_keys = {event.key for event in events} - self._buffer.keys()
+            if len(self._buffer) + len(new_keys) > self.max_buffer:
+                raise RecorderFull()
+            for event in events:
+                self._buffer[event.key] = event
+            self.events += len(events)
+            full = len(self._buffer) >= self.max_batch
+        if full and self._wakeup is not None:
+            self._wakeup.set()
+
+    def pending_for(self, attempt_id: int) -> dict[int, AnswerEvent]:
+        """
+        Respostas da tentativa que ainda não foram gravadas (numero -> evento).
+        Só enxerga o buffer deste processo.
+        """
+        with self._lock:
+            return {
+                event.question_numero: event
+                for event in self._buffer.values()
+                if event.attempt_id == attempt_id
+            }
+
+    def _requeue(self, events: list[AnswerEvent]) -> None:
+        # Devolve ao buffer o lote que falhou, sem sobrescrever escolhas mais novas
+        with self._lock:
+            for event in events:
+                self._buffer.setdefault(event.key, event)
+
+    async def _write(self, db: AsyncSession, events: list[AnswerEvent]) -> None:
+        """
+        Grava um lote de respostas com um único upsert (uma linha por questão)
+        e atualiza os agregados de análise na mesma transação.
+        """
+        await analytics_service.apply_answer_events(db, events)
+        stmt = upsert_statement(
+            db.bind.dialect.name,
+            AttemptAnswer,
+            index_elements=["attempt_id", "question_numero"],
+            update_columns=["chosen", "is_correct", "answered_at"],
+        )
+        await db.execute(
+            stmt,
+            [
+                {
+                    "attempt_id": event.attempt_id,
+                    "question_numero": event.question_numero,
+                    "chosen": event.chosen,
+                    "is_correct": event.is_correct,
+                    "answered_at": event.answered_at,
+                }
+                for event in events
+            ],
+        )
+
+    async def flush(self, db: AsyncSession | None = None) -> int:
+        """
+        Grava tudo o que está no buffer. Retorna o número de respostas gravadas.
+
+        Numa requisição, passe a sessão dela em `db`: o lote é gravado (e
+        commitado) nessa mesma conexão. Abrir uma segunda conexão enquanto a
+        requisição já segura uma esgota o pool sob carga (cada requisição
+        esperando por outra conexão). Sem `db`, a conexão é obtida antes do
+        `_flush_lock`, para que quem espera o lock nunca espere também o pool.
+        """
+        with self._lock:
+            if not self._buffer:
+                return 0
+        if db is not None:
+            return await self._flush(db)
+        async with self.session_factory() as own_db:
+            await own_db.connection()
+            return await self._flush(own_db)
+
+    async def _flush(self, db: AsyncSession) -> int:
+        async with self._flush_lock:
+            with self._lock:
+                if not self._buffer:
+                    return 0
+                events = list(self._buffer.values())
+                self._buffer = {}
+
+            start = time.perf_counter()
+            try:
+                await self._write(db, events)
+                await db.commit()
+            except Exception:
+                self.failures += 1
+                self._requeue(events)
+                await db.rollback()
+                raise
+
+            with self._lock:
+                self.batches += 1
+                self.rows_written += len(events)
+                self.flush_time.add(time.perf_counter() - start)
+            return len(events)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Falha ao gravar respostas; nova tentativa no próximo ciclo.")
+
+    async def start(self) -> None:
+        """
+        Inicia a gravação periódica em segundo plano (no event loop atual).
+        """
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Interrompe a tarefa de fundo e grava o que restar no buffer.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "buffered": len(self._buffer),
+                "events": self.events,
+                "batches": self.batches,
+                "rows_written": self.rows_written,
+                "failures": self.failures,
+                "flush_time": self.flush_time.as_dict(),
+                "running": self._task is not None,
+            }
+
+
+answer_recorder = AnswerRecorder(
+    AsyncSessionLocal,
+    flush_interval=ANSWER_FLUSH_INTERVAL_SECONDS,
+    max_batch=ANSWER_FLUSH_MAX_BATCH,
+    max_buffer=ANSWER_BUFFER_MAX,
+)
+
+
+async def start_attempt(db: AsyncSession, user_id: int, year: int) -> Attempt:
+    """
+    Retorna a tentativa em aberto do usuário para o ano, ou cria uma nova.
+
+    O índice único parcial uq_attempts_open_user_year impede duas tentativas
+    em aberto: se uma requisição concorrente criar a tentativa primeiro,
+    retorna a dela.
+    """
+    attempt = await _open_attempt(db, user_id, year)
+    if attempt is not None:
+        return attempt
+
+    attempt = Attempt(user_id=user_id, year=year)
+    db.add(attempt)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        attempt = await _open_attempt(db, user_id, year)
+        if attempt is None:
+            raise
+        return attempt
+    await db.refresh(attempt)
+    return attempt
+
+
+async def _open_attempt(db: AsyncSession, user_id: int, year: int) -> Attempt | None:
+    result = await db.execute(
+        select(Attempt)
+        .where(Attempt.user_id == user_id, Attempt.year == year, Attempt.finished_at.is_(None))
+    )
+    return result.scalars().first()
+
+
+async def get_attempt(db: AsyncSession, attempt_id: int) -> Attempt | None:
+    return await db.get(Attempt, attempt_id)
+
+
+async def get_answers(db: AsyncSession, attempt_id: int) -> dict[int, str]:
+    """
+    Respostas atuais da tentativa (numero -> letra), incluindo as que ainda
+    estão no buffer do recorder deste processo. Com vários workers, respostas
+    aceitas por outro worker só aparecem depois do próximo flush dele
+    (no máximo ANSWER_FLUSH_INTERVAL_SECONDS).
+    """
+    result = await db.execute(
+        select(AttemptAnswer.question_numero, AttemptAnswer.chosen)
+        .where(AttemptAnswer.attempt_id == attempt_id)
+    )
+    answers = {numero: chosen for numero, chosen in result.all()}
+    for numero, event in answer_recorder.pending_for(attempt_id).items():
+        answers[numero] = event.chosen
+    return answers
+
+
+def record_answers(attempt: Attempt, answers: dict[int, str]) -> int:
+    """
+    Valida as respostas contra o gabarito do ano e as envia ao recorder.
+    Retorna quantas respostas foram aceitas.
+
+    Levanta:
+        ValueError: se houver questão inexistente ou alternativa inválida.
+        RecorderFull: se o buffer estiver cheio.
+    """
+    key = grading_service.get_answer_key(attempt.year)
+    if key is None:
+        raise ValueError(f"Prova do ano {attempt.year} não encontrada.")
+
+    # Valida tudo antes de gravar qualquer coisa
+    choices = grading_service.encode_submissions(key, [answers])[0]
+    correct = grading_service.grade_matrix(key, choices[None, :])["correct"][0]
+
+    now = datetime.now(timezone.utc)
+    events = []
+    for pos in (choices != grading_service.UNANSWERED).nonzero()[0].tolist():
+        events.append(AnswerEvent(
+            attempt_id=attempt.id,
+            question_numero=int(key.numeros[pos]),
+            chosen=ANSWER_OPTIONS[int(choices[pos])],
+            is_correct=bool(correct[pos]),
+            answered_at=now,
+            user_id=attempt.user_id,
+            year=attempt.year,
+            discipline=key.discipline_keys[pos],  # da mesma versão do gabarito
+        ))
+    # Tudo ou nada: se o buffer estiver cheio, o cliente reenvia o lote inteiro
+    answer_recorder.record_many(events)
+    return len(events)
+
+
+async def finish_attempt(db: AsyncSession, attempt: Attempt) -> Attempt:
+    """
+    Marca a tentativa como finalizada (gravando antes as respostas pendentes,
+    na própria sessão da requisição).
+    """
+    await answer_recorder.flush(db)
+    if attempt.finished_at is None:
+        attempt.finished_at = datetime.now(timezone.utc)
+        await db.commit()
+        await db.refresh(attempt)
+    return attempt
@@ -2,13 +2,13 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.database import get_db
-from src.services import user_service
+from src.db.database import get_async_db
+from src.services import async_user_service as user_service
 from src.services.security import verify_access_token
+from src.services.token_cache import Principal, token_cache
 from src.schemas.token import TokenData
-from src.db.models import User
 from src.schemas.roles import UserRole  # ⬅ novo import
 
 
@@ -17,8 +17,19 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Retorna o usuário autenticado pelo token.
+
+    Tokens já verificados ficam no `token_cache` até expirarem, então
+    requisições repetidas com o mesmo token não decodificam o JWT nem
+    consultam o banco.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached.principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais.",
@@ -30,16 +41,19 @@ async def get_current_user(
         raise credentials_exception
     token_data = TokenData(username=username)
 
-    user = user_service.get_user_by_username(db, token_data.username)
-    if user is None:
+    # Só id, username e role: a entidade completa (com password_hash) não é necessária aqui
+    principal = await user_service.get_principal_by_username(db, token_data.username)
+    if principal is None:
         raise credentials_exception
-    return user
+
+    token_cache.put(token, payload, principal)
+    return principal
 
 
 def require_role(*allowed_roles: UserRole):  # ⬅ tipado com UserRole
     async def role_checker(
-        current_user: Annotated[User, Depends(get_current_user)]
-    ) -> User:
+        current_user: Annotated[Principal, Depends(get_current_user)]
+    ) -> Principal:
         # current_user.role é string no modelo, então comparamos com .value
         if current_user.role not in {role.value for role in allowed_roles}:
             raise HTTPException(
@@ -52,8 +66,8 @@ def require_role(*allowed_roles: UserRole):  # ⬅ tipado com UserRole
 
 
 # Aliases de tipos
-AdminUser = Annotated[User, Depends(require_role(UserRole.ADMIN))]
+AdminUser = Annotated[Principal, Depends(require_role(UserRole.ADMIN))]
 AdminOrInstrutorUser = Annotated[
-    User,
+    Principal,
     Depends(require_role(UserRole.ADMIN, UserRole.INSTRUTOR)),
 ]
\ No newline at end of file
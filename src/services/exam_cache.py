@@ -0,0 +1,140 @@
+"""
+Cache de respostas JSON já serializadas para as rotas de provas.
+
+Cada payload é serializado uma única vez por versão do banco de questões e
+guardado junto com um ETag forte (hash do corpo). As rotas apenas comparam
+o ETag com `If-None-Match` e devolvem os bytes prontos (ou 304).
+"""
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.services.exam_service import question_bank
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    body: bytes
+    etag: str
+
+
+def _make_payload(data) -> CachedPayload:
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return CachedPayload(body=body, etag=etag)
+
+
+def _public_question(question: dict, include_answers: bool) -> dict:
+    if include_answers:
+        return question
+    return {key: value for key, value in question.items() if key != "gabarito"}
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Compara o header If-None-Match com o ETag (comparação fraca, RFC 9110).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ExamPayloadCache:
+    """
+    Cache LRU de payloads serializados, invalidado quando o arquivo de
+    questões muda (versão do `question_bank`).
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, CachedPayload] = OrderedDict()
+        self._version = None
+
+    def _get_or_build(self, key: tuple, build) -> CachedPayload:
+        # Quem chama já consultou o question_bank, então a versão está atualizada
+        version = question_bank.version
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                return payload
+
+        payload = _make_payload(build())
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = payload
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return payload
+
+    def years(self) -> CachedPayload:
+        question_bank.years()
+
+        def build():
+            counts = question_bank.question_counts()
+            return {"years": [{"year": year, "questions": counts[year]} for year in sorted(counts)]}
+
+        return self._get_or_build(("years",), build)
+
+    def exam(self, year: int, include_answers: bool) -> CachedPayload | None:
+        """
+        Prova completa do ano. Retorna None se o ano não existir.
+        """
+        questions = question_bank.get_questions(year)
+        if not questions:
+            return None
+
+        def build():
+            return {
+                "year": year,
+                "total": len(questions),
+                "questions": [_public_question(q, include_answers) for q in questions],
+            }
+
+        return self._get_or_build(("exam", year, include_answers), build)
+
+    def page(self, year: int, page: int, size: int, include_answers: bool) -> CachedPayload | None:
+        """
+        Página (1-based) de questões do ano. Retorna None se o ano não existir.
+        """
+        questions = question_bank.get_questions(year)
+        if not questions:
+            return None
+
+        def build():
+            start = (page - 1) * size
+            return {
+                "year": year,
+                "page": page,
+                "size": size,
+                "total": len(questions),
+                "pages": math.ceil(len(questions) / size),
+                "questions": [
+                    _public_question(q, include_answers) for q in questions[start : start + size]
+                ],
+            }
+
+        return self._get_or_build(("page", year, page, size, include_answers), build)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+
+exam_payload_cache = ExamPayloadCache()
@@ -0,0 +1,109 @@
+"""
+Páginas de questões prontas para exibição na interface (Streamlit).
+
+Cada questão vira um dicionário com as alternativas já formatadas
+("A) texto") e a chave usada em st.session_state. As páginas ficam em cache
+por versão do arquivo de questões, e a próxima página pode ser preparada em
+segundo plano enquanto o aluno lê a atual.
+
+Como o Streamlit reexecuta o script a cada interação, o cache precisa viver
+aqui (módulo importado uma vez) e não em src/online_exam.py.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services.exam_service import QuestionBank, question_bank
+
+MAX_CACHED_PAGES = 256
+
+
+def format_question(question: dict) -> dict:
+    """
+    Acrescenta a uma questão (ver `question_to_dict`) os campos de exibição:
+
+        "key":     chave em st.session_state ("q_{ano}_{numero}")
+        "options": ("A) texto", "B) texto", ...)
+    """
+    return {
+        **question,
+        "key": f"q_{question['ano']}_{question['numero']}",
+        "options": tuple(f"{letter}) {text}" for letter, text in question["alternativas"].items()),
+    }
+
+
+class ExamPages:
+    """
+    Cache LRU de páginas formatadas, com pré-carregamento em segundo plano.
+    """
+
+    def __init__(self, bank: QuestionBank, max_pages: int = MAX_CACHED_PAGES):
+        self.bank = bank
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._pages: OrderedDict[tuple, tuple[dict, ...]] = OrderedDict()
+        self._version: tuple[int, int] | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="exam-pages")
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+    def total(self, year: int) -> int:
+        """
+        Quantidade de questões da prova (0 se o ano não existir).
+        """
+        return self.bank.question_counts().get(int(year), 0)
+
+    def _build(self, year: int, page: int, size: int) -> tuple[dict, ...]:
+        start = page * size
+        questions = self.bank.get_questions(year)[start:start + size]
+        return tuple(format_question(question) for question in questions)
+
+    def get_page(self, year: int, page: int, size: int) -> tuple[dict, ...]:
+        """
+        Questões da página `page` (0-based) da prova do ano, já formatadas.
+        """
+        self.bank.years()  # recarrega o banco de questões se o arquivo mudou
+        key = (int(year), page, size)
+        with self._lock:
+            if self._version != self.bank.version:
+                self._pages.clear()
+                self._version = self.bank.version
+            cached = self._pages.get(key)
+            if cached is not None:
+                self._pages.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        questions = self._build(*key)
+        with self._lock:
+            if self._version == self.bank.version:
+                self._pages[key] = questions
+                while len(self._pages) > self.max_pages:
+                    self._pages.popitem(last=False)
+        return questions
+
+    def prefetch(self, year: int, page: int, size: int) -> None:
+        """
+        Prepara a página em segundo plano (sem bloquear a renderização atual).
+        """
+        if page < 0 or page * size >= self.total(year):
+            return
+        with self._lock:
+            if (int(year), page, size) in self._pages:
+                return
+            self.prefetched += 1
+        self._executor.submit(self.get_page, year, page, size)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pages_cached": len(self._pages),
+                "hits": self.hits,
+                "misses": self.misses,
+                "prefetched": self.prefetched,
+            }
+
+
+exam_pages = ExamPages(question_bank)
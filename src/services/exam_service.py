@@ -1,23 +1,239 @@
+import threading
 from pathlib import Path
 
 import pandas as pd
 
+from config.settings import ANSWER_OPTIONS
+from src.services.exam_store import CompiledExams, file_signature, open_compiled, read_exams_csv
+
 
 # Definição de caminhos
 ROOT_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = ROOT_DIR / "data"
 EXAMS_FILE = DATA_DIR / "exams_with_answers.csv"
+# Gerado por `python -m src.services.exam_store`
+COMPILED_EXAMS_FILE = DATA_DIR / "exams_with_answers.qbank"
+
+
+def question_to_dict(row: dict) -> dict:
+    """
+    Converte uma linha do banco de questões em um dicionário simples:
+
+        {"ano", "numero", "disciplina", "enunciado",
+         "alternativas": {"A": "...", ...}, "gabarito"}
+
+    Alternativas vazias são omitidas.
+    """
+    alternativas = {}
+    for letter in ANSWER_OPTIONS:
+        value = row.get(f"alternativa_{letter.lower()}")
+        if value is not None and not pd.isna(value):
+            alternativas[letter] = str(value)
+
+    disciplina = row.get("disciplina")
+    return {
+        "ano": int(row["ano"]),
+        "numero": int(row["numero"]),
+        "disciplina": None if disciplina is None or pd.isna(disciplina) else str(disciplina),
+        "enunciado": str(row["enunciado"]),
+        "alternativas": alternativas,
+        "gabarito": str(row.get("gabarito", "")).strip().upper(),
+    }
+
+
+class QuestionBank:
+    """
+    Cache do banco de questões compartilhado por todo o processo.
+
+    - Se existir um arquivo compilado (`exam_store`) gerado a partir do CSV
+      atual, ele é mapeado em memória e cada ano é decodificado sob demanda.
+    - Caso contrário (ausente ou desatualizado), o CSV é lido uma única vez
+      e já particionado por ano.
+    - A cada acesso, compara mtime/tamanho do CSV; se mudou, recarrega.
+    - Entrega visões por ano que não devem ser alteradas pelo chamador.
+    - Mantém contadores de hits, misses e reloads.
+    """
+
+    def __init__(self, path: Path, compiled_path: Path | None = None):
+        self.path = Path(path)
+        self.compiled_path = Path(compiled_path) if compiled_path else None
+        self._lock = threading.Lock()
+        self._signature: tuple[int, int] | None = None
+        self._columns: list[str] = []
+        self._years: list[int] = []
+        self._counts: dict[int, int] = {}
+        self._by_year: dict[int, pd.DataFrame] = {}
+        self._questions: dict[int, tuple[dict, ...]] = {}
+        self._compiled: CompiledExams | None = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _load(self, signature: tuple[int, int]) -> None:
+        if self._compiled is not None:
+            self._compiled.close()
+            self._compiled = None
+
+        compiled = None
+        if self.compiled_path is not None:
+            compiled = open_compiled(self.compiled_path, signature)
+
+        if compiled is not None:
+            # Só o índice é lido agora; os anos são decodificados sob demanda
+            self._columns = compiled.columns
+            self._years = compiled.years
+            self._counts = compiled.row_counts
+            self._by_year = {}
+            self._compiled = compiled
+        else:
+            df = read_exams_csv(self.path)
+            self._columns = list(df.columns)
+            self._by_year = {
+                int(year): frame.reset_index(drop=True)
+                for year, frame in df.groupby("ano", sort=True)
+            }
+            self._years = sorted(self._by_year)
+            self._counts = {year: len(frame) for year, frame in self._by_year.items()}
+
+        self._questions = {}
+        if self._signature is not None:
+            self.reloads += 1
+        self._signature = signature
+
+    def _ensure_fresh(self) -> bool:
+        """
+        Garante que o cache corresponde ao arquivo em disco.
+        Retorna True se foi necessário (re)carregar.
+        """
+        signature = file_signature(self.path)  # FileNotFoundError se o CSV não existir
+        if signature == self._signature:
+            return False
+        with self._lock:
+            # Outra thread pode ter recarregado enquanto esperávamos o lock
+            if signature != self._signature:
+                self._load(signature)
+                return True
+        return False
+
+    def get_year(self, year: int) -> pd.DataFrame:
+        """
+        Retorna as questões do ano informado (DataFrame vazio se não houver).
+
+        O DataFrame devolvido é uma cópia rasa da partição em cache:
+        não altere seus valores.
+        """
+        year = int(year)
+        loaded = self._ensure_fresh()
+        frame = self._by_year.get(year)
+        with self._lock:
+            if frame is None and self._compiled is not None and year in self._years:
+                frame = self._by_year.get(year)
+                if frame is None:
+                    frame = self._compiled.read_year(year)
+                    self._by_year[year] = frame
+                    loaded = True
+            if loaded:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if frame is None:
+            return pd.DataFrame(columns=self._columns)
+        return frame.copy(deep=False)
+
+    def years(self) -> list[int]:
+        """
+        Anos presentes no arquivo, em ordem crescente.
+        """
+        self._ensure_fresh()
+        return list(self._years)
+
+    def question_counts(self) -> dict[int, int]:
+        """
+        Quantidade de questões por ano.
+        """
+        self._ensure_fresh()
+        return dict(self._counts)
+
+    def get_questions(self, year: int) -> tuple[dict, ...]:
+        """
+        Questões do ano como dicionários prontos para exibição/serialização
+        (ver `question_to_dict`), montados uma vez por versão do arquivo.
+        """
+        year = int(year)
+        self._ensure_fresh()
+        questions = self._questions.get(year)
+        if questions is not None:
+            with self._lock:
+                self.hits += 1
+            return questions
+
+        frame = self.get_year(year)
+        questions = self._questions.get(year)
+        if questions is None:
+            questions = tuple(question_to_dict(row) for row in frame.to_dict("records"))
+            with self._lock:
+                self._questions[year] = questions
+        return questions
+
+    @property
+    def version(self) -> tuple[int, int] | None:
+        """
+        Assinatura (mtime_ns, tamanho) do arquivo atualmente em cache.
+        """
+        return self._signature
+
+    def stats(self) -> dict:
+        """
+        Contadores do cache, úteis para monitoramento.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "years_cached": len(self._by_year),
+                "loaded": self._signature is not None,
+                "source": "compiled" if self._compiled is not None else "csv",
+            }
+
+    def clear(self) -> None:
+        """
+        Descarta o cache; o próximo acesso relê o arquivo.
+        """
+        with self._lock:
+            if self._compiled is not None:
+                self._compiled.close()
+                self._compiled = None
+            self._signature = None
+            self._years = []
+            self._counts = {}
+            self._by_year = {}
+            self._questions = {}
+
+
+question_bank = QuestionBank(EXAMS_FILE, COMPILED_EXAMS_FILE)
 
 
 def load_exam(year: int) -> pd.DataFrame:
     """
-    Carrega o CSV de provas e filtra pelo ano informado.
-    Retorna um DataFrame apenas com as questões daquele ano.
+    Retorna um DataFrame apenas com as questões do ano informado.
+
+    Os dados vêm do cache do processo (`question_bank`); o arquivo só é
+    relido quando o CSV muda em disco.
     """
-    try:
-        df = pd.read_csv(EXAMS_FILE, encoding="utf-8")
-    except UnicodeDecodeError:
-        df = pd.read_csv(EXAMS_FILE, encoding="latin-1")
+    return question_bank.get_year(year)
+
 
-    df.columns = df.columns.str.lower().str.strip()
-    return df[df["ano"] == year]
\ No newline at end of file
+def get_questions(year: int) -> tuple[dict, ...]:
+    """
+    Questões do ano como dicionários (ver `question_to_dict`).
+    Os dicionários são compartilhados: não os altere.
+    """
+    return question_bank.get_questions(year)
+
+
+def get_cache_stats() -> dict:
+    """
+    Estatísticas de hit/miss/reload do cache de questões.
+    """
+    return question_bank.stats()
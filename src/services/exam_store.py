@@ -0,0 +1,190 @@
+"""
+Formato binário compilado do banco de questões.
+
+Layout do arquivo (inteiros little-endian):
+
+    MAGIC (8 bytes) | tamanho do cabeçalho (uint32) | cabeçalho JSON | blocos
+
+O cabeçalho guarda a assinatura do CSV de origem (mtime_ns, tamanho), as
+colunas e, para cada ano, o offset/tamanho do seu bloco. Cada bloco é um
+JSON colunar ({coluna: [valores]}) com as questões daquele ano, de modo que
+abrir um ano exige decodificar apenas o seu bloco.
+
+Para gerar o arquivo:
+
+    python -m src.services.exam_store
+"""
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import pandas as pd
+
+
+MAGIC = b"CFSQB\x00\x01\x00"
+_HEADER_LEN = struct.Struct("<I")
+
+
+def read_exams_csv(path: Path) -> pd.DataFrame:
+    """
+    Lê o CSV completo de provas, tentando UTF-8 e depois latin-1.
+    Normaliza os nomes das colunas (minúsculas, sem espaços nas pontas).
+    """
+    try:
+        df = pd.read_csv(path, encoding="utf-8")
+    except UnicodeDecodeError:
+        df = pd.read_csv(path, encoding="latin-1")
+
+    df.columns = df.columns.str.lower().str.strip()
+    return df
+
+
+def file_signature(path: Path) -> tuple[int, int]:
+    """
+    Assinatura (mtime_ns, tamanho) usada para detectar mudanças no CSV.
+    """
+    stat = Path(path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _column_values(series: pd.Series) -> list:
+    """
+    Converte uma coluna em lista serializável (NaN vira None).
+    """
+    return [None if pd.isna(value) else value for value in series.tolist()]
+
+
+def compile_exams(csv_path: Path, out_path: Path) -> dict:
+    """
+    Compila o CSV de provas no formato binário indexado por ano.
+
+    A escrita é feita em arquivo temporário e movida no final, para que
+    leitores nunca vejam um arquivo pela metade.
+    Retorna o cabeçalho gravado.
+    """
+    csv_path = Path(csv_path)
+    out_path = Path(out_path)
+    signature = file_signature(csv_path)
+    df = read_exams_csv(csv_path)
+
+    blocks = []
+    years = {}
+    offset = 0
+    for year, frame in df.groupby("ano", sort=True):
+        payload = {col: _column_values(frame[col]) for col in df.columns}
+        block = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        years[str(int(year))] = {"offset": offset, "length": len(block), "rows": len(frame)}
+        blocks.append(block)
+        offset += len(block)
+
+    header = {
+        "source": {"mtime_ns": signature[0], "size": signature[1]},
+        "columns": list(df.columns),
+        "years": years,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, out_path)
+    return header
+
+
+class CompiledExams:
+    """
+    Leitor do arquivo compilado, mapeado em memória.
+
+    Apenas o cabeçalho é decodificado na abertura; `read_year` decodifica
+    somente o bloco do ano pedido.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Arquivo vazio não pode ser mapeado
+            self._file.close()
+            raise
+
+        try:
+            if self._mm[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"Arquivo não é um banco de questões compilado: {self.path}")
+            start = len(MAGIC)
+            (header_len,) = _HEADER_LEN.unpack_from(self._mm, start)
+            start += _HEADER_LEN.size
+            header = json.loads(self._mm[start : start + header_len])
+        except Exception:
+            self.close()
+            raise
+
+        self._data_start = start + header_len
+        self.source_signature = (header["source"]["mtime_ns"], header["source"]["size"])
+        self.columns: list[str] = header["columns"]
+        self._index: dict[int, dict] = {int(year): entry for year, entry in header["years"].items()}
+
+    @property
+    def years(self) -> list[int]:
+        return sorted(self._index)
+
+    @property
+    def row_counts(self) -> dict[int, int]:
+        """
+        Quantidade de questões por ano, lida do índice (sem decodificar blocos).
+        """
+        return {year: entry["rows"] for year, entry in self._index.items()}
+
+    def read_year(self, year: int) -> pd.DataFrame | None:
+        """
+        Decodifica apenas as questões do ano informado.
+        Retorna None se o ano não existir no arquivo.
+        """
+        entry = self._index.get(int(year))
+        if entry is None:
+            return None
+        start = self._data_start + entry["offset"]
+        payload = json.loads(self._mm[start : start + entry["length"]])
+        return pd.DataFrame(payload, columns=self.columns)
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+
+def open_compiled(path: Path, expected_signature: tuple[int, int]) -> CompiledExams | None:
+    """
+    Abre o arquivo compilado se ele existir e corresponder ao CSV atual.
+
+    Retorna None quando o arquivo não existe, está corrompido ou foi gerado
+    a partir de outra versão do CSV (nesses casos, use o CSV).
+    """
+    if not Path(path).exists():
+        return None
+    try:
+        compiled = CompiledExams(path)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+    if compiled.source_signature != tuple(expected_signature):
+        compiled.close()
+        return None
+    return compiled
+
+
+def main():
+    from src.services.exam_service import COMPILED_EXAMS_FILE, EXAMS_FILE
+
+    header = compile_exams(EXAMS_FILE, COMPILED_EXAMS_FILE)
+    total = sum(entry["rows"] for entry in header["years"].values())
+    print(f"Banco compilado em: {COMPILED_EXAMS_FILE} ({len(header['years'])} anos, {total} questões)")
+
+
+if __name__ == "__main__":
+    main()
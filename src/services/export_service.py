@@ -0,0 +1,157 @@
+"""
+Exportação dos resultados das tentativas (turmas inteiras) em CSV ou XLSX.
+
+As linhas vêm do banco por um cursor no servidor (`AsyncSession.stream`,
+EXPORT_BATCH_SIZE linhas por vez) e são convertidas à medida que chegam,
+sem montar um DataFrame:
+
+- CSV: cada bloco de linhas já vira bytes da resposta (o cabeçalho sai
+  antes da primeira consulta terminar).
+- XLSX: a planilha é escrita com o openpyxl em modo write-only (as linhas
+  vão para um arquivo temporário, não ficam em memória). Um .xlsx é um zip
+  que só fica válido no final, então os bytes são enviados depois que a
+  planilha é fechada, lidos do arquivo temporário em blocos.
+"""
+import asyncio
+import csv
+import io
+import tempfile
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+from openpyxl import Workbook
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Attempt, AttemptAnswer, User
+from src.services.exam_service import question_bank
+
+EXPORT_BATCH_SIZE = 1000
+FILE_CHUNK_SIZE = 64 * 1024
+
+COLUMNS = (
+    "attempt_id",
+    "user_id",
+    "username",
+    "full_name",
+    "rank",
+    "year",
+    "started_at",
+    "finished_at",
+    "answered",
+    "correct",
+    "total_questions",
+    "score",
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def results_query(year: int | None = None, rank: str | None = None, include_unfinished: bool = False):
+    """
+    Uma linha por tentativa, com os dados do usuário e a contagem de
+    respostas/acertos (subconsultas correlacionadas, que usam o índice
+    único de attempt_answers e não impedem o envio das primeiras linhas).
+    """
+    answered = (
+        select(func.count())
+        .where(AttemptAnswer.attempt_id == Attempt.id)
+        .scalar_subquery()
+    )
+    correct = (
+        select(func.count())
+        .where(AttemptAnswer.attempt_id == Attempt.id, AttemptAnswer.is_correct.is_(True))
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            Attempt.id, User.id, User.username, User.full_name, User.rank,
+            Attempt.year, Attempt.started_at, Attempt.finished_at, answered, correct,
+        )
+        .join(User, User.id == Attempt.user_id)
+        .order_by(Attempt.id)
+    )
+    if year is not None:
+        stmt = stmt.where(Attempt.year == year)
+    if rank is not None:
+        stmt = stmt.where(User.rank == rank)
+    if not include_unfinished:
+        stmt = stmt.where(Attempt.finished_at.is_not(None))
+    return stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def _with_score(row, totals: dict[int, int]) -> tuple:
+    # Acrescenta total de questões da prova e nota (% de acertos)
+    year, correct = row[5], row[9]
+    total = totals.get(year, 0)
+    return (*row, total, round(correct * 100 / total, 2) if total else None)
+
+
+async def result_batches(db: AsyncSession, **filters) -> AsyncIterator[list[tuple]]:
+    """
+    Linhas do resultado (na ordem de COLUMNS), em blocos de até EXPORT_BATCH_SIZE.
+    """
+    totals = question_bank.question_counts()
+    result = await db.stream(results_query(**filters))
+    async for partition in result.partitions():
+        yield [_with_score(row, totals) for row in partition]
+
+
+def _utc_naive(value: datetime | None) -> datetime | None:
+    # O Excel não guarda fuso horário: as datas vão em UTC
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def csv_chunks(batches: AsyncIterator[list[tuple]]) -> AsyncIterator[bytes]:
+    """
+    CSV (utf-8 com BOM, para o Excel reconhecer os acentos), um bloco de bytes por lote.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in batch
+        )
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def xlsx_chunks(batches: AsyncIterator[list[tuple]]) -> AsyncIterator[bytes]:
+    """
+    Planilha XLSX escrita em modo write-only e enviada em blocos ao final.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Resultados")
+    sheet.append(COLUMNS)
+
+    def append(batch: list[tuple]) -> None:
+        for row in batch:
+            sheet.append([_utc_naive(value) if isinstance(value, datetime) else value for value in row])
+
+    with tempfile.TemporaryFile() as output:
+        async for batch in batches:
+            # openpyxl é síncrono: escreve fora do event loop
+            await asyncio.to_thread(append, batch)
+        await asyncio.to_thread(workbook.save, output)
+
+        output.seek(0)
+        while chunk := await asyncio.to_thread(output.read, FILE_CHUNK_SIZE):
+            yield chunk
+
+
+def export_chunks(db: AsyncSession, fmt: str, **filters) -> AsyncIterator[bytes]:
+    """
+    Bytes do arquivo de resultados no formato `fmt` ("csv" ou "xlsx").
+    """
+    batches = result_batches(db, **filters)
+    return csv_chunks(batches) if fmt == "csv" else xlsx_chunks(batches)
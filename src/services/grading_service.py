@@ -0,0 +1,243 @@
+"""
+Correção de provas em lote.
+
+O gabarito de cada ano é pré-processado uma única vez (por versão do banco
+de questões) em arrays numpy: letras viram códigos inteiros e cada questão
+aponta para o índice da sua disciplina. Assim uma submissão inteira — ou
+milhares delas — é corrigida com comparações vetorizadas, sem percorrer
+strings questão a questão.
+
+Questões com gabarito "ANULADA" contam como acerto para todos.
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from config.settings import ANSWER_OPTIONS
+from src.services.exam_service import question_bank
+from src.services.text_utils import discipline_key
+
+
+UNANSWERED = -1
+ANNULLED = -2  # gabarito de questão anulada: acerto para todos
+INVALID_KEY = -3  # gabarito ausente/desconhecido: ninguém acerta
+
+LETTER_CODES = {letter: code for code, letter in enumerate(ANSWER_OPTIONS)}
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """
+    Gabarito de um ano em formato vetorizado.
+    """
+    year: int
+    numeros: np.ndarray            # número de cada questão, na ordem da prova
+    positions: dict[int, int]      # numero -> posição nos arrays
+    keys: np.ndarray               # código da letra correta (ou ANNULLED/INVALID_KEY)
+    disciplines: tuple[str, ...]   # nomes das disciplinas
+    discipline_matrix: np.ndarray  # (n_questões, n_disciplinas), one-hot
+    discipline_totals: tuple[int, ...]
+    discipline_keys: tuple[str, ...]  # disciplina de cada questão (ver discipline_key)
+    annulled: int
+
+    @property
+    def size(self) -> int:
+        return len(self.numeros)
+
+
+def _key_code(gabarito: str) -> int:
+    if gabarito in LETTER_CODES:
+        return LETTER_CODES[gabarito]
+    if gabarito.startswith("ANULAD"):
+        return ANNULLED
+    return INVALID_KEY
+
+
+def build_answer_key(year: int) -> AnswerKey | None:
+    """
+    Monta o gabarito vetorizado do ano a partir do banco de questões.
+    Retorna None se o ano não existir.
+    """
+    questions = question_bank.get_questions(year)
+    if not questions:
+        return None
+
+    disciplines: list[str] = []
+    discipline_index: dict[str, int] = {}
+    discipline_ids = []
+    for q in questions:
+        name = q["disciplina"] or "N/A"
+        if name not in discipline_index:
+            discipline_index[name] = len(disciplines)
+            disciplines.append(name)
+        discipline_ids.append(discipline_index[name])
+
+    discipline_matrix = np.zeros((len(questions), len(disciplines)), dtype=np.int32)
+    discipline_matrix[np.arange(len(questions)), discipline_ids] = 1
+
+    numeros = np.array([q["numero"] for q in questions], dtype=np.int64)
+    keys = np.array([_key_code(q["gabarito"]) for q in questions], dtype=np.int8)
+    return AnswerKey(
+        year=int(year),
+        numeros=numeros,
+        positions={int(n): i for i, n in enumerate(numeros)},
+        keys=keys,
+        disciplines=tuple(disciplines),
+        discipline_matrix=discipline_matrix,
+        discipline_totals=tuple(int(n) for n in discipline_matrix.sum(axis=0)),
+        discipline_keys=tuple(discipline_key(q["disciplina"]) for q in questions),
+        annulled=int((keys == ANNULLED).sum()),
+    )
+
+
+_key_cache: dict[int, AnswerKey] = {}
+_key_cache_version = None
+_key_cache_lock = threading.Lock()
+
+
+def get_answer_key(year: int) -> AnswerKey | None:
+    """
+    Gabarito vetorizado do ano, em cache até o arquivo de questões mudar.
+    """
+    global _key_cache_version
+    year = int(year)
+    question_bank.years()  # atualiza a versão se o arquivo mudou
+    version = question_bank.version
+    with _key_cache_lock:
+        if version != _key_cache_version:
+            _key_cache.clear()
+            _key_cache_version = version
+        key = _key_cache.get(year)
+    if key is not None:
+        return key
+
+    key = build_answer_key(year)
+    if key is not None:
+        with _key_cache_lock:
+            if version == _key_cache_version:
+                _key_cache[year] = key
+    return key
+
+
+def normalize_letter(value: str) -> str:
+    """
+    Aceita "a", " B ", "C) texto..." e devolve só a letra em maiúscula.
+    """
+    letter = str(value).strip().split(")")[0].strip().upper()
+    if letter not in LETTER_CODES:
+        raise ValueError(f"Alternativa inválida: {value!r}.")
+    return letter
+
+
+def encode_submissions(key: AnswerKey, submissions: list[dict[int, str]]) -> np.ndarray:
+    """
+    Converte submissões (numero -> letra) em uma matriz (n_submissões, n_questões)
+    de códigos de letra, com UNANSWERED onde não houve resposta.
+
+    Levanta:
+        ValueError: se houver questão inexistente ou alternativa inválida.
+    """
+    choices = np.full((len(submissions), key.size), UNANSWERED, dtype=np.int8)
+    positions = key.positions
+    for row, answers in enumerate(submissions):
+        for numero, letter in answers.items():
+            pos = positions.get(int(numero))
+            if pos is None:
+                raise ValueError(f"Questão {numero} não existe na prova de {key.year}.")
+            code = LETTER_CODES.get(letter)
+            if code is None:
+                code = LETTER_CODES[normalize_letter(letter)]
+            choices[row, pos] = code
+    return choices
+
+
+def grade_matrix(key: AnswerKey, choices: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Corrige uma matriz de respostas de uma só vez.
+
+    Retorna arrays com, por submissão: acertos por questão, total de
+    respondidas/acertos e acertos/respondidas por disciplina.
+    """
+    answered = choices != UNANSWERED
+    correct = (choices == key.keys) | (key.keys == ANNULLED)
+    correct_int = correct.astype(np.int32)
+    answered_int = answered.astype(np.int32)
+    return {
+        "correct": correct,
+        "answered": answered,
+        "total_correct": correct_int.sum(axis=1),
+        "total_answered": answered_int.sum(axis=1),
+        "discipline_correct": correct_int @ key.discipline_matrix,
+        "discipline_answered": answered_int @ key.discipline_matrix,
+    }
+
+
+def _result_dicts(key: AnswerKey, graded: dict[str, np.ndarray], choices: np.ndarray) -> list[dict]:
+    """
+    Converte os arrays corrigidos em dicionários de resultado, um por submissão.
+    """
+    total = key.size
+    numeros = key.numeros.tolist()
+    # .tolist() de uma vez evita milhares de conversões numpy -> Python
+    correct_rows = graded["correct"].tolist()
+    choice_rows = choices.tolist()
+    total_correct = graded["total_correct"].tolist()
+    total_answered = graded["total_answered"].tolist()
+    discipline_correct = graded["discipline_correct"].tolist()
+    discipline_answered = graded["discipline_answered"].tolist()
+
+    results = []
+    for row in range(len(choice_rows)):
+        results.append({
+            "year": key.year,
+            "total_questions": total,
+            "answered": total_answered[row],
+            "correct": total_correct[row],
+            "annulled": key.annulled,
+            "score": round(total_correct[row] / total, 4) if total else 0.0,
+            "disciplines": [
+                {
+                    "disciplina": name,
+                    "total": key.discipline_totals[i],
+                    "answered": discipline_answered[row][i],
+                    "correct": discipline_correct[row][i],
+                }
+                for i, name in enumerate(key.disciplines)
+            ],
+            "questions": [
+                {
+                    "numero": numero,
+                    "chosen": ANSWER_OPTIONS[code] if code >= 0 else None,
+                    "correct": correct,
+                }
+                for numero, code, correct in zip(numeros, choice_rows[row], correct_rows[row])
+            ],
+        })
+    return results
+
+
+def grade_submissions(year: int, submissions: list[dict[int, str]]) -> list[dict] | None:
+    """
+    Corrige várias submissões do mesmo ano numa única passada vetorizada.
+
+    Retorna uma lista de resultados (mesma ordem das submissões) ou None se
+    o ano não existir.
+
+    Levanta:
+        ValueError: se houver questão inexistente ou alternativa inválida.
+    """
+    key = get_answer_key(year)
+    if key is None:
+        return None
+    choices = encode_submissions(key, submissions)
+    graded = grade_matrix(key, choices)
+    return _result_dicts(key, graded, choices)
+
+
+def grade_submission(year: int, answers: dict[int, str]) -> dict | None:
+    """
+    Corrige uma submissão (numero -> letra). Retorna None se o ano não existir.
+    """
+    results = grade_submissions(year, [answers])
+    return None if results is None else results[0]
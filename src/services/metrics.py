@@ -0,0 +1,228 @@
+"""
+Estruturas simples de métricas compartilhadas pelos serviços.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class TimingStats:
+    """
+    Acumulador simples (contagem, soma e máximo) de durações em segundos.
+    Não é thread-safe: proteja com o lock de quem o utiliza.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+# ----------------------------------------------------------------------------
+# Métricas no formato texto do Prometheus (exposto em GET /metrics)
+# ----------------------------------------------------------------------------
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SPAN_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_float(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_format_float(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def dec(self, *labelvalues, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_format_float(value)}" for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple, list] = {}  # labels -> [contagens por bucket, soma]
+
+    def observe(self, value: float, *labelvalues) -> None:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * len(self.buckets), 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = self._header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_float(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_format_float(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas do processo, renderizado no formato texto do Prometheus.
+    """
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "Requisições HTTP atendidas.", ("method", "route", "status"),
+))
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP.", ("method", "route"),
+))
+HTTP_REQUESTS_IN_PROGRESS = registry.register(Gauge(
+    "http_requests_in_progress", "Requisições HTTP em andamento.", ("method",),
+))
+SPAN_DURATION = registry.register(Histogram(
+    "span_duration_seconds",
+    "Duração de cada operação interna (db_query, argon2_verify, argon2_hash, jwt_encode, jwt_decode).",
+    ("span",),
+    buckets=SPAN_BUCKETS,
+))
+HTTP_REQUEST_SPAN = registry.register(Histogram(
+    "http_request_span_seconds",
+    "Tempo total gasto em cada operação interna por requisição, por rota.",
+    ("method", "route", "span"),
+    buckets=SPAN_BUCKETS,
+))
+
+# Tempo acumulado por operação na requisição atual (ver `request_span_scope`)
+_request_spans: ContextVar[dict[str, float] | None] = ContextVar("request_spans", default=None)
+
+
+def record_span(span: str, seconds: float) -> None:
+    """
+    Registra a duração de uma operação interna e a soma à requisição atual.
+    """
+    SPAN_DURATION.observe(seconds, span)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans[span] = spans.get(span, 0.0) + seconds
+
+
+@contextmanager
+def timed_span(span: str):
+    """
+    Mede o bloco como uma operação interna (ver `record_span`).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(span, time.perf_counter() - start)
+
+
+@contextmanager
+def request_span_scope():
+    """
+    Abre o escopo de uma requisição: dentro do bloco, `record_span` também
+    acumula as durações no dicionário retornado (operação -> segundos).
+    """
+    spans: dict[str, float] = {}
+    token = _request_spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _request_spans.reset(token)
@@ -0,0 +1,174 @@
+"""
+Índices secundários do banco de questões e montagem de simulados.
+
+Todas as questões recebem um id de linha (posição em `rows`). Para cada
+versão do arquivo são pré-calculados os conjuntos de ids por ano, por
+disciplina e por (ano, disciplina); um simulado é montado unindo/cruzando
+esses conjuntos, sem filtrar DataFrames a cada requisição.
+"""
+import random
+import threading
+from dataclasses import dataclass
+
+from src.services.exam_service import QuestionBank, question_bank
+from src.services.text_utils import discipline_key
+
+
+@dataclass(frozen=True, slots=True)
+class _Indexes:
+    version: tuple[int, int] | None
+    rows: tuple[dict, ...]
+    by_year: dict[int, frozenset[int]]
+    by_discipline: dict[str, frozenset[int]]
+    by_year_discipline: dict[tuple[int, str], frozenset[int]]
+    discipline_names: dict[str, str]  # chave canônica -> nome mais frequente
+
+
+def _build(bank: QuestionBank) -> _Indexes:
+    rows: list[dict] = []
+    by_year: dict[int, set[int]] = {}
+    by_discipline: dict[str, set[int]] = {}
+    by_year_discipline: dict[tuple[int, str], set[int]] = {}
+    name_counts: dict[str, dict[str, int]] = {}
+
+    version = bank.version
+    for year in bank.years():
+        for question in bank.get_questions(year):
+            row_id = len(rows)
+            rows.append(question)
+            key = discipline_key(question["disciplina"])
+            by_year.setdefault(year, set()).add(row_id)
+            by_discipline.setdefault(key, set()).add(row_id)
+            by_year_discipline.setdefault((year, key), set()).add(row_id)
+            names = name_counts.setdefault(key, {})
+            name = question["disciplina"] or ""
+            names[name] = names.get(name, 0) + 1
+
+    return _Indexes(
+        version=version,
+        rows=tuple(rows),
+        by_year={year: frozenset(ids) for year, ids in by_year.items()},
+        by_discipline={key: frozenset(ids) for key, ids in by_discipline.items()},
+        by_year_discipline={key: frozenset(ids) for key, ids in by_year_discipline.items()},
+        discipline_names={
+            key: max(names.items(), key=lambda item: (item[1], item[0]))[0]
+            for key, names in name_counts.items()
+        },
+    )
+
+
+def _select(
+    indexes: _Indexes,
+    disciplines: list[str] | None,
+    year_from: int | None,
+    year_to: int | None,
+) -> list[int]:
+    """
+    Implementação de `QuestionIndex.select` sobre um snapshot dos índices:
+    os ids retornados só valem para `indexes.rows` desse mesmo snapshot.
+    """
+    years = [
+        year for year in indexes.by_year
+        if (year_from is None or year >= year_from) and (year_to is None or year <= year_to)
+    ]
+    keys = {discipline_key(name) for name in disciplines or ()}
+
+    ids: set[int] = set()
+    if keys:
+        for year in years:
+            for key in keys:
+                ids |= indexes.by_year_discipline.get((year, key), frozenset())
+    elif year_from is None and year_to is None:
+        ids = set(range(len(indexes.rows)))
+    else:
+        for year in years:
+            ids |= indexes.by_year[year]
+    return sorted(ids)
+
+
+class QuestionIndex:
+    """
+    Índices por ano/disciplina, reconstruídos quando o arquivo de questões muda.
+    """
+
+    def __init__(self, bank: QuestionBank):
+        self.bank = bank
+        self._lock = threading.Lock()
+        self._indexes: _Indexes | None = None
+
+    def _current(self) -> _Indexes:
+        self.bank.years()  # recarrega o banco de questões se o arquivo mudou
+        indexes = self._indexes
+        if indexes is not None and indexes.version == self.bank.version:
+            return indexes
+        with self._lock:
+            indexes = self._indexes
+            if indexes is None or indexes.version != self.bank.version:
+                indexes = _build(self.bank)
+                self._indexes = indexes
+            return indexes
+
+    def disciplines(self) -> list[dict]:
+        """
+        Disciplinas disponíveis com o total de questões e os anos em que aparecem.
+        Grafias diferentes da mesma disciplina são agrupadas.
+        """
+        indexes = self._current()
+        result = []
+        for key, ids in indexes.by_discipline.items():
+            years = sorted(year for year, other in indexes.by_year_discipline if other == key)
+            result.append({
+                "disciplina": indexes.discipline_names[key],
+                "questions": len(ids),
+                "years": years,
+            })
+        return sorted(result, key=lambda item: item["disciplina"])
+
+    def discipline_name(self, key: str) -> str:
+        """
+        Nome mais frequente da disciplina com a chave canônica `key`
+        (ver `discipline_key`); a própria chave se não houver questões dela.
+        """
+        return self._current().discipline_names.get(key, key) or "N/A"
+
+    def select(
+        self,
+        disciplines: list[str] | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+    ) -> list[int]:
+        """
+        Ids das questões que atendem aos filtros, em ordem (ano, número).
+        Disciplinas são comparadas sem diferenciar acentos/maiúsculas.
+        """
+        return _select(self._current(), disciplines, year_from, year_to)
+
+    def practice_exam(
+        self,
+        size: int,
+        disciplines: list[str] | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        seed: int | None = None,
+    ) -> dict:
+        """
+        Sorteia até `size` questões que atendem aos filtros.
+
+        O mesmo `seed` com os mesmos filtros (e o mesmo arquivo) gera o mesmo
+        simulado; se omitido, um seed é sorteado e devolvido no resultado.
+        """
+        # Um único snapshot: um reload no meio não mistura ids e linhas
+        indexes = self._current()
+        candidates = _select(indexes, disciplines, year_from, year_to)
+        if seed is None:
+            seed = random.randrange(2**31)
+        chosen = random.Random(seed).sample(candidates, min(size, len(candidates)))
+        return {
+            "seed": seed,
+            "available": len(candidates),
+            "total": len(chosen),
+            "questions": [indexes.rows[row_id] for row_id in sorted(chosen)],
+        }
+
+
+question_index = QuestionIndex(question_bank)
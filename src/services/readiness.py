@@ -0,0 +1,156 @@
+"""
+Prontidão do worker (GET /ready) e aquecimento dos caches na inicialização.
+
+A API sobe sem tocar no banco nem no arquivo de questões: as conexões são
+abertas sob demanda e os caches do banco de questões são aquecidos em
+segundo plano. Enquanto o aquecimento não termina, ou se o banco não
+responde, /ready responde 503 e o balanceador não manda tráfego ao worker.
+Se o aquecimento falhar (ex.: arquivo de questões ausente por um instante),
+ele é repetido com backoff até dar certo, e /ready volta a 200 sozinho.
+"""
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from config.settings import (
+    QUESTIONS_PER_PAGE,
+    READY_CACHE_SECONDS,
+    READY_DB_TIMEOUT_SECONDS,
+    WARM_CACHES_ON_STARTUP,
+)
+from src.db.database import async_engine
+from src.services import grading_service
+from src.services.exam_cache import exam_payload_cache
+from src.services.exam_service import question_bank
+from src.services.question_index import question_index
+from src.services.search_index import search_index
+
+logger = logging.getLogger(__name__)
+
+
+def warm_caches() -> int:
+    """
+    Carrega o banco de questões e monta os caches derivados (gabaritos,
+    respostas pré-serializadas, índices de busca e de disciplinas).
+    Retorna o número de anos carregados.
+    """
+    years = question_bank.years()
+    for year in years:
+        question_bank.get_questions(year)
+        grading_service.get_answer_key(year)
+        exam_payload_cache.exam(year, include_answers=False)
+        exam_payload_cache.page(year, 1, QUESTIONS_PER_PAGE, include_answers=False)
+    exam_payload_cache.years()
+    question_index.disciplines()
+    search_index.warm()
+    return len(years)
+
+
+class ReadinessProbe:
+    """
+    Verificações de prontidão com resultado em cache por `cache_seconds`,
+    para que probes frequentes (ou vários ao mesmo tempo) não consultem o
+    banco a cada chamada.
+    """
+
+    def __init__(
+        self,
+        engine,
+        cache_seconds: float,
+        db_timeout: float,
+        warm_on_startup: bool = True,
+        warm_retry_seconds: float = 1.0,
+        warm_retry_max_seconds: float = 30.0,
+    ):
+        self.engine = engine
+        self.warm_on_startup = warm_on_startup
+        self.warm_retry_seconds = warm_retry_seconds
+        self.warm_retry_max_seconds = warm_retry_max_seconds
+        self.cache_seconds = cache_seconds
+        self.db_timeout = db_timeout
+        self._lock = asyncio.Lock()
+        self._result: dict | None = None
+        self._checked_at = 0.0
+        self.warmed = False
+        self.warm_error: str | None = None
+        self.warm_seconds: float | None = None
+
+    async def warm_up(self) -> None:
+        """
+        Aquece os caches numa thread, sem bloquear o event loop. Em caso de
+        falha, tenta de novo com backoff exponencial (até
+        `warm_retry_max_seconds` entre tentativas) até conseguir.
+        """
+        delay = self.warm_retry_seconds
+        while True:
+            start = time.perf_counter()
+            try:
+                years = await asyncio.to_thread(warm_caches)
+                break
+            except Exception as e:
+                self.warm_error = str(e)
+                logger.exception("Falha ao aquecer o banco de questões; nova tentativa em %.1fs.", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.warm_retry_max_seconds)
+        self.warm_seconds = time.perf_counter() - start
+        self.warmed = True
+        self.warm_error = None
+        logger.info("Banco de questões aquecido: %d anos em %.2fs.", years, self.warm_seconds)
+
+    def _check_caches(self) -> dict:
+        if not self.warm_on_startup:
+            return {"ok": True, "detail": "aquecimento desativado"}
+        if not self.warmed:
+            return {"ok": False, "detail": self.warm_error or "aquecendo"}
+        if question_bank.version is None:
+            return {"ok": False, "detail": "banco de questões não carregado"}
+        return {"ok": True, "warm_seconds": round(self.warm_seconds, 3)}
+
+    async def _check_database(self) -> dict:
+        pool = self.engine.pool
+        if isinstance(pool, QueuePool) and pool._max_overflow >= 0:
+            # Pool esgotado: o worker não atenderia a requisição a tempo
+            if pool.checkedout() >= pool.size() + pool._max_overflow:
+                return {"ok": False, "detail": "pool de conexões esgotado"}
+
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.db_timeout):
+                async with self.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except TimeoutError:
+            return {"ok": False, "detail": "banco não respondeu a tempo"}
+        except Exception as e:
+            return {"ok": False, "detail": f"banco indisponível: {type(e).__name__}"}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    async def check(self) -> dict:
+        """
+        Resultado das verificações: {"ready", "checks": {...}, "cached"}.
+        """
+        if self._result is not None and time.monotonic() - self._checked_at < self.cache_seconds:
+            return {**self._result, "cached": True}
+
+        async with self._lock:
+            # Outro probe pode ter atualizado o resultado enquanto esperávamos
+            if self._result is not None and time.monotonic() - self._checked_at < self.cache_seconds:
+                return {**self._result, "cached": True}
+
+            checks = {
+                "question_bank": self._check_caches(),
+                "database": await self._check_database(),
+            }
+            self._result = {"ready": all(check["ok"] for check in checks.values()), "checks": checks}
+            self._checked_at = time.monotonic()
+            return {**self._result, "cached": False}
+
+
+readiness = ReadinessProbe(
+    async_engine,
+    cache_seconds=READY_CACHE_SECONDS,
+    db_timeout=READY_DB_TIMEOUT_SECONDS,
+    warm_on_startup=WARM_CACHES_ON_STARTUP,
+)
@@ -0,0 +1,145 @@
+"""
+Refresh tokens: renovação do token de acesso sem senha (e sem Argon2).
+
+O refresh token é um JWT assinado com um `jti` aleatório; a tabela
+`refresh_tokens` guarda o jti para permitir revogação no servidor
+(logout, troca de senha). Cada renovação revoga o refresh token usado e
+emite outro com validade completa (sessão deslizante).
+
+Linhas expiradas ou revogadas não servem mais para nada; `purge_refresh_tokens`
+as remove (ex.: `python -m src.services.refresh_token_service` num cron).
+"""
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import REFRESH_TOKEN_EXPIRE_DAYS
+from src.db.models import RefreshToken, User
+from src.services.security import create_refresh_token, decode_refresh_token
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite devolve datetimes sem fuso; tratamos como UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+async def issue_refresh_token(db: AsyncSession, user: User) -> tuple[str, datetime]:
+    """
+    Emite e registra um novo refresh token. Retorna (token, expires_at).
+    """
+    jti = secrets.token_urlsafe(32)
+    expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(jti=jti, user_id=user.id, expires_at=expires_at))
+    await db.commit()
+    return create_refresh_token(user.username, jti, expires_at), expires_at
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> tuple[User, str, datetime]:
+    """
+    Valida o refresh token, revoga-o e emite outro.
+    Retorna (usuário, novo token, expires_at).
+
+    Levanta:
+        ValueError: se o token for inválido, expirado, revogado ou de
+            usuário que não existe mais.
+    """
+    claims = decode_refresh_token(token)
+    now = datetime.now(timezone.utc)
+
+    # Revoga de forma atômica: se duas renovações concorrerem, só uma vence
+    result = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == claims["jti"], RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.expires_at)
+    )
+    row = result.first()
+    if row is None or _as_utc(row.expires_at) <= now:
+        await db.rollback()
+        raise ValueError("Refresh token inválido ou expirado.")
+
+    user = await db.get(User, row.user_id)
+    if user is None or user.username != claims["sub"]:
+        await db.rollback()
+        raise ValueError("Refresh token inválido ou expirado.")
+
+    new_token, expires_at = await issue_refresh_token(db, user)  # faz o commit da revogação junto
+    return user, new_token, expires_at
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
+    """
+    Revoga um refresh token (logout). Retorna False se ele já era inválido.
+    """
+    try:
+        claims = decode_refresh_token(token)
+    except ValueError:
+        return False
+    result = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == claims["jti"], RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+def revoke_user_refresh_tokens_statement(user_id: int):
+    """
+    UPDATE que revoga os refresh tokens ativos do usuário (também usado pelo
+    `user_service` síncrono ao trocar a senha).
+    """
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+async def revoke_user_refresh_tokens(db: AsyncSession, user_id: int, commit: bool = True) -> int:
+    """
+    Revoga todos os refresh tokens ativos do usuário (ex.: troca de senha).
+    Retorna quantos foram revogados.
+
+    Com `commit=False` a revogação fica na transação em andamento, para ser
+    gravada junto com a alteração que a motivou (ex.: a nova senha).
+    """
+    result = await db.execute(revoke_user_refresh_tokens_statement(user_id))
+    if commit:
+        await db.commit()
+    return result.rowcount
+
+
+async def purge_refresh_tokens(db: AsyncSession) -> int:
+    """
+    Apaga os refresh tokens expirados ou revogados. Retorna quantos foram apagados.
+    """
+    result = await db.execute(
+        delete(RefreshToken).where(
+            or_(
+                RefreshToken.expires_at <= datetime.now(timezone.utc),
+                RefreshToken.revoked_at.is_not(None),
+            )
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def _main() -> None:
+    from src.db.database import AsyncSessionLocal, async_engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            purged = await purge_refresh_tokens(db)
+        print(f"{purged} refresh tokens expirados ou revogados apagados.")
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    asyncio.run(_main())
@@ -0,0 +1,273 @@
+"""
+Busca textual nas questões de todas as provas.
+
+Índice invertido em memória sobre enunciado + alternativas, com:
+
+- normalização sem acentos e em minúsculas ("Legislação" == "legislacao");
+- remoção de stopwords do português e redução simples de plurais
+  ("militares" -> "militar", "ações" -> "acao");
+- ranking BM25.
+
+O índice é dividido em segmentos por ano. Quando o arquivo do banco de
+questões muda, só os anos cujo conteúdo mudou são reindexados.
+"""
+import math
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from src.services.exam_service import QuestionBank, question_bank
+from src.services.metrics import TimingStats
+from src.services.text_utils import TOKEN_RE, discipline_key, fold_text
+
+# Parâmetros usuais do BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Palavras muito frequentes que não ajudam a distinguir questões (já sem acento)
+STOPWORDS = frozenset("""
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como da das de dela delas dele
+deles do dos e ela elas ele eles em entre era eram essa essas esse esses esta estas este
+estes eu foi foram ha isso isto ja la lhe lhes mais mas me mesmo meu minha muito na nas
+nem no nos nossa nosso num numa o os ou para pela pelas pelo pelos por qual quando que
+quem se sem ser seu seus sua suas sao so tambem te tem tu um uma umas uns voce
+""".split())
+
+
+def _singular(token: str) -> str:
+    """
+    Redução de plurais do português (sem acentos), no estilo do RSLP.
+    Aplicada igualmente aos documentos e às consultas.
+    """
+    if len(token) <= 3 or not token.endswith("s"):
+        return token
+    if token.endswith(("oes", "aes")):
+        return token[:-3] + "ao"
+    if token.endswith("ais"):
+        return token[:-2] + "l"
+    if token.endswith("eis"):
+        return token[:-3] + "el"
+    if token.endswith("ois"):
+        return token[:-3] + "ol"
+    if token.endswith("ns"):
+        return token[:-2] + "m"
+    if token.endswith(("res", "zes")):
+        return token[:-2]
+    if token.endswith(("is", "us", "ss")):
+        return token
+    return token[:-1]
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Termos indexáveis de um texto (sem acentos, sem stopwords, no singular).
+    """
+    return [
+        _singular(token)
+        for token in TOKEN_RE.findall(fold_text(text))
+        if token not in STOPWORDS
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class _Doc:
+    question: dict
+    length: int
+    discipline: str
+
+
+@dataclass(frozen=True, slots=True)
+class _Segment:
+    """
+    Índice de um ano: documentos e postings termo -> [(doc, frequência)].
+    """
+    fingerprint: int
+    docs: tuple[_Doc, ...]
+    postings: dict[str, tuple[tuple[int, int], ...]]
+    total_length: int
+
+
+@dataclass(frozen=True, slots=True)
+class _Snapshot:
+    """
+    Estado imutável do índice; as consultas leem um snapshot sem lock.
+    """
+    version: tuple[int, int] | None
+    segments: dict[int, _Segment]
+    doc_freq: dict[str, int]
+    doc_count: int
+    total_length: int
+
+
+def _fingerprint(questions: tuple[dict, ...]) -> int:
+    return hash(tuple(
+        (q["numero"], q["disciplina"], q["enunciado"], tuple(q["alternativas"].items()))
+        for q in questions
+    ))
+
+
+def _build_segment(questions: tuple[dict, ...], fingerprint: int) -> _Segment:
+    docs = []
+    postings: dict[str, list[tuple[int, int]]] = {}
+    total_length = 0
+    for doc_id, question in enumerate(questions):
+        text = " ".join([question["enunciado"], *question["alternativas"].values()])
+        terms = tokenize(text)
+        for term, freq in Counter(terms).items():
+            postings.setdefault(term, []).append((doc_id, freq))
+        docs.append(_Doc(question, len(terms), discipline_key(question["disciplina"])))
+        total_length += len(terms)
+    return _Segment(
+        fingerprint=fingerprint,
+        docs=tuple(docs),
+        postings={term: tuple(items) for term, items in postings.items()},
+        total_length=total_length,
+    )
+
+
+def _apply_segment(doc_freq: dict[str, int], segment: _Segment, sign: int) -> None:
+    for term, items in segment.postings.items():
+        count = doc_freq.get(term, 0) + sign * len(items)
+        if count:
+            doc_freq[term] = count
+        else:
+            doc_freq.pop(term, None)
+
+
+class SearchIndex:
+    """
+    Índice de busca sobre um QuestionBank, reconstruído por ano quando o
+    arquivo de questões muda.
+    """
+
+    def __init__(self, bank: QuestionBank):
+        self.bank = bank
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot(None, {}, {}, 0, 0)
+        self.builds = 0
+        self.segments_rebuilt = 0
+        self.queries = 0
+        self.build_time = TimingStats()
+        self.query_time = TimingStats()
+
+    def _ensure_fresh(self) -> _Snapshot:
+        self.bank.years()  # recarrega o banco de questões se o arquivo mudou
+        snapshot = self._snapshot
+        if snapshot.version == self.bank.version and snapshot.version is not None:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            version = self.bank.version
+            if snapshot.version == version and version is not None:
+                return snapshot
+
+            start = time.perf_counter()
+            segments = dict(snapshot.segments)
+            doc_freq = dict(snapshot.doc_freq)
+            rebuilt = 0
+            years = self.bank.years()
+
+            for year in set(segments) - set(years):
+                _apply_segment(doc_freq, segments.pop(year), -1)
+
+            for year in years:
+                questions = self.bank.get_questions(year)
+                fingerprint = _fingerprint(questions)
+                old = segments.get(year)
+                if old is not None and old.fingerprint == fingerprint:
+                    continue
+                if old is not None:
+                    _apply_segment(doc_freq, old, -1)
+                segment = _build_segment(questions, fingerprint)
+                _apply_segment(doc_freq, segment, +1)
+                segments[year] = segment
+                rebuilt += 1
+
+            self._snapshot = _Snapshot(
+                version=version,
+                segments=segments,
+                doc_freq=doc_freq,
+                doc_count=sum(len(s.docs) for s in segments.values()),
+                total_length=sum(s.total_length for s in segments.values()),
+            )
+            self.builds += 1
+            self.segments_rebuilt += rebuilt
+            self.build_time.add(time.perf_counter() - start)
+            return self._snapshot
+
+    def warm(self) -> None:
+        """
+        Constrói o índice agora (em vez de na primeira busca).
+        """
+        self._ensure_fresh()
+
+    def search(
+        self,
+        query: str,
+        discipline: str | None = None,
+        year: int | None = None,
+        limit: int = 20,
+    ) -> tuple[int, list[tuple[float, dict]]]:
+        """
+        Busca as questões mais relevantes para `query` (BM25).
+
+        Filtra opcionalmente por disciplina (sem diferenciar acentos/maiúsculas)
+        e por ano. Retorna (total de resultados, [(score, questão), ...]) com
+        no máximo `limit` itens, do mais para o menos relevante.
+        """
+        start = time.perf_counter()
+        snapshot = self._ensure_fresh()
+        terms = set(tokenize(query))
+        wanted_discipline = discipline_key(discipline) if discipline else None
+
+        scores: dict[tuple[int, int], float] = {}
+        if terms and snapshot.doc_count:
+            avg_length = snapshot.total_length / snapshot.doc_count
+            segments = snapshot.segments
+            if year is not None:
+                segments = {year: segments[year]} if year in segments else {}
+
+            for term in terms:
+                df = snapshot.doc_freq.get(term)
+                if not df:
+                    continue
+                idf = math.log(1 + (snapshot.doc_count - df + 0.5) / (df + 0.5))
+                for seg_year, segment in segments.items():
+                    for doc_id, freq in segment.postings.get(term, ()):
+                        doc = segment.docs[doc_id]
+                        if wanted_discipline is not None and doc.discipline != wanted_discipline:
+                            continue
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc.length / avg_length)
+                        score = idf * freq * (BM25_K1 + 1) / (freq + norm)
+                        key = (seg_year, doc_id)
+                        scores[key] = scores.get(key, 0.0) + score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        hits = [
+            (score, snapshot.segments[seg_year].docs[doc_id].question)
+            for (seg_year, doc_id), score in ranked
+        ]
+
+        with self._lock:
+            self.queries += 1
+            self.query_time.add(time.perf_counter() - start)
+        return len(scores), hits
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = self._snapshot
+            return {
+                "documents": snapshot.doc_count,
+                "terms": len(snapshot.doc_freq),
+                "years": len(snapshot.segments),
+                "builds": self.builds,
+                "segments_rebuilt": self.segments_rebuilt,
+                "queries": self.queries,
+                "build_time": self.build_time.as_dict(),
+                "query_time": self.query_time.as_dict(),
+            }
+
+
+search_index = SearchIndex(question_bank)
@@ -1,5 +1,10 @@
 # src/services/security.py
 
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from passlib.context import CryptContext
@@ -7,6 +12,9 @@ from jose import JWTError, jwt # Importar JWTError e jwt
 from fastapi import HTTPException, status # Importar HTTPException e status
 
 from config.settings import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES # Importar as configurações JWT
+from config.settings import ACCESS_TOKEN_EXPIRE_JITTER_SECONDS
+from config.settings import PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_WORKERS
+from src.services.metrics import TimingStats, timed_span
 
 # Agora usamos argon2 em vez de bcrypt
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
@@ -25,6 +33,133 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+class PasswordHasherBusy(Exception):
+    """
+    Levantada quando a fila do pool de hashing está cheia.
+    """
+
+
+class PasswordHasherPool:
+    """
+    Pool limitado de threads para o Argon2.
+
+    O Argon2 libera o GIL enquanto calcula, então threads dão paralelismo
+    real sem travar o event loop. Quando há mais de `max_workers + max_queue`
+    tarefas pendentes, novas tarefas são recusadas com PasswordHasherBusy.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="argon2")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.queue_wait = TimingStats()
+        self.hash_time = TimingStats()
+
+    async def run(self, fn, *args):
+        """
+        Executa fn(*args) no pool e aguarda o resultado sem bloquear o event loop.
+
+        Levanta:
+            PasswordHasherBusy: se a fila estiver cheia.
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.queue_wait.add(started - submitted)
+                    self.hash_time.add(finished - started)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, job)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "rejected": self.rejected,
+                "queue_wait": self.queue_wait.as_dict(),
+                "hash_time": self.hash_time.as_dict(),
+            }
+
+
+password_hasher_pool = PasswordHasherPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+
+
+def _service_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servidor sobrecarregado. Tente novamente em instantes.",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Versão assíncrona de hash_password, executada no pool de hashing.
+    Responde 503 se o pool estiver saturado.
+    """
+    try:
+        with timed_span("argon2_hash"):
+            return await password_hasher_pool.run(hash_password, password)
+    except PasswordHasherBusy:
+        raise _service_unavailable()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Versão assíncrona de verify_password, executada no pool de hashing.
+    Responde 503 se o pool estiver saturado.
+    """
+    try:
+        # Inclui a espera na fila do pool: é o tempo que a requisição sente
+        with timed_span("argon2_verify"):
+            return await password_hasher_pool.run(verify_password, plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise _service_unavailable()
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    Gera hashes em lote (importações), em paralelo no pool de hashing.
+
+    Usa no máximo metade das threads do pool (ao menos uma), deixando as
+    demais livres para logins; se o pool estiver saturado, espera em vez de
+    falhar — a importação fica mais lenta, mas não toma a fila de quem está
+    tentando entrar.
+    """
+    semaphore = asyncio.Semaphore(max(1, password_hasher_pool.max_workers // 2))
+
+    async def hash_one(password: str) -> str:
+        async with semaphore:
+            while True:
+                try:
+                    return await password_hasher_pool.run(hash_password, password)
+                except PasswordHasherBusy:
+                    await asyncio.sleep(0.05)
+
+    return await asyncio.gather(*(hash_one(password) for password in passwords))
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """
     Cria um token de acesso JWT.
@@ -35,19 +170,59 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    with timed_span("jwt_encode"):
+        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def access_token_lifetime() -> timedelta:
+    """
+    Validade de um novo token de acesso: ACCESS_TOKEN_EXPIRE_MINUTES menos
+    um valor sorteado de até ACCESS_TOKEN_EXPIRE_JITTER_SECONDS.
+    """
+    jitter = random.uniform(0, ACCESS_TOKEN_EXPIRE_JITTER_SECONDS)
+    return timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES) - timedelta(seconds=jitter)
+
+
 def verify_access_token(token: str, credentials_exception):
     """
     Verifica a validade de um token de acesso JWT e retorna os dados contidos nele.
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with timed_span("jwt_decode"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
+        if payload.get("type") == "refresh":
+            # Refresh tokens só servem para /auth/refresh
+            raise credentials_exception
         return payload
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+
+
+def create_refresh_token(subject: str, jti: str, expires_at: datetime) -> str:
+    """
+    Cria um refresh token JWT (identificado por `jti` no banco).
+    """
+    to_encode = {"sub": subject, "jti": jti, "type": "refresh", "exp": expires_at}
+    with timed_span("jwt_encode"):
+        return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def decode_refresh_token(token: str) -> dict:
+    """
+    Verifica assinatura, expiração e tipo de um refresh token.
+
+    Levanta:
+        ValueError: se o token for inválido.
+    """
+    try:
+        with timed_span("jwt_decode"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError as e:
+        raise ValueError("Refresh token inválido ou expirado.") from e
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("sub"):
+        raise ValueError("Refresh token inválido ou expirado.")
+    return payload
\ No newline at end of file
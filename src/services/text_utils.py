@@ -0,0 +1,24 @@
+"""
+Normalização de texto compartilhada (busca, gabaritos, índices e análises).
+"""
+import re
+import unicodedata
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold_text(text: str) -> str:
+    """
+    Remove acentos e converte para minúsculas.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def discipline_key(disciplina: str | None) -> str:
+    """
+    Forma canônica de uma disciplina para comparação: sem acentos, minúsculas
+    e pontuação/espaços colapsados ("ADMINISTRATIVA - DISCIPLINAR" ==
+    "administrativa-disciplinar").
+    """
+    return " ".join(TOKEN_RE.findall(fold_text(disciplina or "")))
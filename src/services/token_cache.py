@@ -0,0 +1,160 @@
+"""
+Cache de tokens já verificados e do usuário correspondente.
+
+`get_current_user` consulta este cache antes de decodificar o JWT e buscar o
+usuário (só id, username e role: ver `Principal`) no banco. As entradas
+expiram no que vier primeiro: o `exp` do token ou TOKEN_CACHE_TTL_SECONDS.
+`user_service` invalida as entradas de um usuário sempre que ele é alterado
+ou removido.
+
+O perfil completo (UserRead, devolvido por GET /users/me) também fica aqui,
+por usuário, enquanto ele tiver algum token no cache; é descartado junto
+com as entradas dele, então /users/me só consulta o banco na primeira vez.
+
+O cache é por processo: com vários workers, uma alteração feita em um worker
+só é vista pelos outros quando suas entradas expiram (no máximo o TTL).
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from config.settings import TOKEN_CACHE_MAX_ENTRIES, TOKEN_CACHE_TTL_SECONDS
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Usuário autenticado, só com o necessário para autorização.
+    O perfil completo (UserRead) é cacheado à parte: ver `TokenCache.get_profile`.
+    """
+    id: int
+    username: str
+    role: str
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(id=user.id, username=user.username, role=user.role)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedToken:
+    claims: dict
+    principal: Principal
+    expires_at: float  # time.monotonic()
+
+
+class TokenCache:
+    """
+    Cache LRU com TTL, indexado pelo token e com índice reverso por usuário
+    para invalidação.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedToken] = OrderedDict()
+        self._tokens_by_user: dict[int, set[str]] = {}
+        self._profiles: dict[int, object] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _discard(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry.principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry.principal.id]
+                self._profiles.pop(entry.principal.id, None)
+
+    def get(self, token: str) -> CachedToken | None:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._discard(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry
+
+    def put(self, token: str, claims: dict, principal: Principal) -> None:
+        """
+        Guarda o token até o menor entre o TTL do cache e o `exp` do token.
+        """
+        ttl = self.ttl_seconds
+        exp = claims.get("exp")
+        if exp is not None:
+            ttl = min(ttl, float(exp) - time.time())
+        if ttl <= 0:
+            return
+
+        entry = CachedToken(claims=claims, principal=principal, expires_at=time.monotonic() + ttl)
+        with self._lock:
+            self._discard(token)
+            self._entries[token] = entry
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def generation(self) -> int:
+        """
+        Contador de invalidações; leia antes de carregar um perfil do banco e
+        passe a `put_profile`.
+        """
+        with self._lock:
+            return self.invalidations
+
+    def get_profile(self, user_id: int):
+        with self._lock:
+            return self._profiles.get(user_id)
+
+    def put_profile(self, user_id: int, profile, generation: int) -> None:
+        """
+        Guarda o perfil do usuário, se ele tiver algum token no cache e nada
+        tiver sido invalidado desde `generation` (o perfil carregado poderia
+        já estar desatualizado).
+        """
+        with self._lock:
+            if generation == self.invalidations and user_id in self._tokens_by_user:
+                self._profiles[user_id] = profile
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Remove todas as entradas (e o perfil) de um usuário (chamado após update/delete).
+        """
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._discard(token)
+            self._profiles.pop(user_id, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+            self._profiles.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "profiles": len(self._profiles),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+token_cache = TokenCache(TOKEN_CACHE_MAX_ENTRIES, TOKEN_CACHE_TTL_SECONDS)
@@ -0,0 +1,256 @@
+"""
+Importação de usuários em lote (matrícula de turmas inteiras).
+
+Fluxo por bloco de linhas (`chunk_size`):
+
+1. Valida cada linha com UserCreate e deriva o username.
+2. Rejeita duplicatas dentro do próprio arquivo.
+3. Verifica, em uma única consulta, username/email já cadastrados.
+4. Gera os hashes Argon2 das linhas válidas em paralelo (pool de hashing).
+5. Insere tudo com um INSERT de múltiplas linhas e faz commit do bloco.
+
+O resultado de cada linha é devolvido assim que o seu bloco termina, para
+que a API (e o CLI) possam transmitir o relatório enquanto importam.
+"""
+import asyncio
+import csv
+import io
+import json
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import User
+from src.schemas.roles import UserRole
+from src.schemas.user import UserCreate
+from src.services import async_user_service
+from src.services.security import hash_passwords
+
+DEFAULT_CHUNK_SIZE = 500
+SUPPORTED_FORMATS = ("csv", "jsonl")
+_VALID_ROLES = {role.value for role in UserRole}
+
+
+def detect_format(filename: str | None, content_type: str | None = None) -> str | None:
+    """
+    Descobre o formato ("csv" ou "jsonl") pela extensão ou pelo content-type.
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "jsonl"
+    return None
+
+
+def read_rows(stream: io.TextIOBase, fmt: str) -> Iterator[dict | str]:
+    """
+    Lê as linhas do arquivo sem carregá-lo inteiro em memória.
+
+    Produz um dict por linha; linhas JSONL inválidas são produzidas como a
+    string da mensagem de erro, para que entrem no relatório.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    if fmt == "jsonl":
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield f"JSON inválido: {e.msg}."
+                continue
+            yield data if isinstance(data, dict) else "Cada linha deve ser um objeto JSON."
+        return
+    raise ValueError(f"Formato não suportado: {fmt}. Use um de {SUPPORTED_FORMATS}.")
+
+
+def _clean_row(raw: dict) -> dict:
+    """
+    Normaliza uma linha: strings vazias viram None e o role padrão é 'aluno'.
+    """
+    row = {
+        key.strip().lower(): (value.strip() or None) if isinstance(value, str) else value
+        for key, value in raw.items()
+        if key
+    }
+    if not row.get("role"):
+        row["role"] = UserRole.ALUNO.value
+    return row
+
+
+def _error(row_number: int, detail: str, username: str | None = None) -> dict:
+    return {"row": row_number, "status": "error", "username": username, "detail": detail}
+
+
+def _validation_detail(error: ValidationError) -> str:
+    parts = []
+    for item in error.errors():
+        field = ".".join(str(loc) for loc in item["loc"])
+        parts.append(f"{field}: {item['msg']}")
+    return "; ".join(parts)
+
+
+class _ChunkState:
+    """
+    Usernames/emails já vistos no arquivo, para detectar duplicatas internas.
+    """
+
+    def __init__(self):
+        self.usernames: set[str] = set()
+        self.emails: set[str] = set()
+
+
+async def _import_chunk(
+    db: AsyncSession,
+    chunk: list[tuple[int, dict | str]],
+    seen: _ChunkState,
+) -> list[dict]:
+    results: dict[int, dict] = {}
+    candidates: list[tuple[int, UserCreate, str]] = []
+
+    # 1 e 2) validação e duplicatas no próprio arquivo
+    for row_number, raw in chunk:
+        if isinstance(raw, str):
+            results[row_number] = _error(row_number, raw)
+            continue
+        row = _clean_row(raw)
+        try:
+            user_in = UserCreate(**row)
+        except ValidationError as e:
+            results[row_number] = _error(row_number, _validation_detail(e), row.get("username"))
+            continue
+        if user_in.role not in _VALID_ROLES:
+            results[row_number] = _error(row_number, f"Role inválido: {user_in.role}.", user_in.username)
+            continue
+
+        username = user_in.username  # já derivado do email, se vazio (UserCreate)
+        if username in seen.usernames:
+            results[row_number] = _error(row_number, "Username repetido no arquivo.", username)
+            continue
+        if user_in.email in seen.emails:
+            results[row_number] = _error(row_number, "Email repetido no arquivo.", username)
+            continue
+        seen.usernames.add(username)
+        seen.emails.add(user_in.email)
+        candidates.append((row_number, user_in, username))
+
+    # 3) conflitos com o banco, em uma consulta para o bloco inteiro
+    taken_usernames, taken_emails = await async_user_service.find_existing(
+        db,
+        usernames={username for _, _, username in candidates},
+        emails={user_in.email for _, user_in, _ in candidates},
+    )
+    valid = []
+    for row_number, user_in, username in candidates:
+        if username in taken_usernames:
+            results[row_number] = _error(row_number, "Username já está em uso.", username)
+        elif user_in.email in taken_emails:
+            results[row_number] = _error(row_number, "Email já está em uso.", username)
+        else:
+            valid.append((row_number, user_in, username))
+
+    if valid:
+        # 4) hashes em paralelo, só para as linhas que serão inseridas
+        hashes = await hash_passwords([user_in.password for _, user_in, _ in valid])
+        values = [
+            {
+                "username": username,
+                "email": user_in.email,
+                "password_hash": password_hash,
+                "full_name": user_in.full_name,
+                "birth_date": user_in.birth_date,
+                "role": user_in.role,
+                "rank": user_in.rank,
+            }
+            for (_, user_in, username), password_hash in zip(valid, hashes)
+        ]
+
+        # 5) INSERT de múltiplas linhas + commit do bloco
+        try:
+            result = await db.execute(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                values,
+            )
+            ids = result.scalars().all()
+            await db.commit()
+        except IntegrityError:
+            # Alguém cadastrou um desses usuários no meio tempo: insere um a um
+            await db.rollback()
+            ids = []
+            for row_values in values:
+                try:
+                    user = await async_user_service.create_user(db, **row_values)
+                    ids.append(user.id)
+                except ValueError as e:
+                    ids.append(e)
+
+        for (row_number, _, username), user_id in zip(valid, ids):
+            if isinstance(user_id, ValueError):
+                results[row_number] = _error(row_number, str(user_id), username)
+            else:
+                results[row_number] = {
+                    "row": row_number,
+                    "status": "created",
+                    "username": username,
+                    "id": user_id,
+                }
+
+    return [results[row_number] for row_number, _ in chunk]
+
+
+async def import_users(
+    db: AsyncSession,
+    rows: Iterable[dict | str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[dict]:
+    """
+    Importa usuários em blocos de `chunk_size` linhas, lidas de `rows` numa
+    thread, produzindo o resultado de cada linha
+    (numeradas a partir de 1) e, por fim, um resumo:
+
+        {"row": 3, "status": "created", "username": "...", "id": 42}
+        {"row": 4, "status": "error", "username": "...", "detail": "..."}
+        {"summary": {"total": 2, "created": 1, "errors": 1}}
+    """
+    seen = _ChunkState()
+    created = errors = 0
+    chunk: list[tuple[int, dict | str]] = []
+
+    async def flush():
+        nonlocal created, errors
+        for result in await _import_chunk(db, chunk, seen):
+            if result["status"] == "created":
+                created += 1
+            else:
+                errors += 1
+            yield result
+        chunk.clear()
+
+    rows = iter(rows)
+    row_number = 0
+    while True:
+        # A leitura (e decodificação) do arquivo roda numa thread: um upload
+        # grande não bloqueia o event loop
+        batch = await asyncio.to_thread(list, islice(rows, chunk_size))
+        if not batch:
+            break
+        for raw in batch:
+            row_number += 1
+            chunk.append((row_number, raw))
+        async for result in flush():
+            yield result
+
+    yield {"summary": {"total": created + errors, "created": created, "errors": errors}}
@@ -2,11 +2,14 @@
 
 from datetime import date
 
+from sqlalchemy import delete, or_, select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from src.db.models import User
 from src.schemas.user import UserUpdate  # ← adiciona isso
+from src.services.refresh_token_service import revoke_user_refresh_tokens_statement
+from src.services.token_cache import Principal, token_cache
 
 
 def create_user(
@@ -45,13 +48,51 @@ def create_user(
         db.commit()
     except IntegrityError as e:
         db.rollback()
-        # Violação de UNIQUE (provavelmente username ou email)
-        raise ValueError("Username ou email já cadastrados.") from e
+        # Violação de UNIQUE: descobre qual coluna conflitou (só neste caso raro)
+        conflicts = find_conflicts(db, username=username, email=email)
+        raise ValueError(conflict_message(conflicts)) from e
 
     db.refresh(user)  # Atualiza com dados do banco (id, created_at, etc.)
     return user
 
 
+def conflict_message(conflicts: set[str]) -> str:
+    """
+    Mensagem de erro para as colunas UNIQUE em conflito.
+    """
+    if "username" in conflicts:
+        return "Username já está em uso."
+    if "email" in conflicts:
+        return "Email já está em uso."
+    return "Username ou email já cadastrados."
+
+
+def conflicting_columns(rows, *, username: str, email: str) -> set[str]:
+    """
+    Dado (username, email) de linhas existentes, indica quais colunas conflitam.
+    """
+    conflicts = set()
+    for existing_username, existing_email in rows:
+        if existing_username == username:
+            conflicts.add("username")
+        if existing_email == email:
+            conflicts.add("email")
+    return conflicts
+
+
+def find_conflicts(db: Session, *, username: str, email: str) -> set[str]:
+    """
+    Verifica, em uma única consulta indexada, se username e/ou email já estão
+    cadastrados. Retorna o subconjunto de {"username", "email"} em uso.
+    """
+    rows = db.execute(
+        select(User.username, User.email)
+        .where(or_(User.username == username, User.email == email))
+        .limit(2)  # no máximo uma linha por coluna UNIQUE
+    ).all()
+    return conflicting_columns(rows, username=username, email=email)
+
+
 def get_user_by_username(db: Session, username: str) -> User | None:
     """
     Busca um usuário pelo username.
@@ -60,6 +101,22 @@ def get_user_by_username(db: Session, username: str) -> User | None:
     return db.query(User).filter(User.username == username).first()
 
 
+def principal_query(username: str):
+    """
+    SELECT só das colunas usadas na autorização (id, username, role).
+    """
+    return select(User.id, User.username, User.role).where(User.username == username).limit(1)
+
+
+def get_principal_by_username(db: Session, username: str) -> Principal | None:
+    """
+    Busca o usuário pelo username sem carregar a entidade completa.
+    Retorna um Principal ou None se não existir.
+    """
+    row = db.execute(principal_query(username)).first()
+    return Principal.from_user(row) if row is not None else None
+
+
 def get_user_by_email(db: Session, email: str) -> User | None:
     """
     Busca um usuário pelo email.
@@ -73,49 +130,124 @@ def get_user_by_id(db: Session, user_id: int) -> User | None:
     """
     return db.query(User).filter(User.id == user_id).first()
 
-def update_user(
-    db: Session,
-    user_id: int,
-    user_update: UserUpdate,
-) -> User | None:
+def _like_pattern(text: str) -> str:
+    # Escapa os curingas do LIKE digitados na busca
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def list_users_query(
+    *,
+    role: str | None = None,
+    rank: str | None = None,
+    q: str | None = None,
+    after: int | None = None,
+    limit: int = 50,
+):
     """
-    Atualiza parcialmente os dados de um usuário.
+    SELECT de uma página de usuários, ordenada por id (paginação por chave:
+    `after` é o último id da página anterior, sem OFFSET).
 
-    Retorna o usuário atualizado ou None se não encontrado.
+    - role/rank usam os índices (role, id) e (rank, id).
+    - q busca trechos de full_name ou username, sem diferenciar maiúsculas
+      (no PostgreSQL, acelerado pelos índices trigram do pg_trgm).
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return None
+    stmt = select(User)
+    if role is not None:
+        stmt = stmt.where(User.role == role)
+    if rank is not None:
+        stmt = stmt.where(User.rank == rank)
+    if q:
+        pattern = _like_pattern(q)
+        stmt = stmt.where(or_(
+            User.full_name.ilike(pattern, escape="\\"),
+            User.username.ilike(pattern, escape="\\"),
+        ))
+    if after is not None:
+        stmt = stmt.where(User.id > after)
+    return stmt.order_by(User.id).limit(limit)
 
-    # Atualiza apenas campos enviados (não None)
-    if user_update.email is not None:
-        user.email = user_update.email
 
-    if user_update.username is not None:
-        user.username = user_update.username
+def list_users(db: Session, **filters) -> list[User]:
+    """
+    Uma página de usuários (ver `list_users_query` para os filtros).
+    """
+    return list(db.execute(list_users_query(**filters)).scalars())
+
 
-    if user_update.full_name is not None:
-        user.full_name = user_update.full_name
+UPDATABLE_FIELDS = ("email", "username", "full_name", "birth_date", "rank")
 
-    if user_update.birth_date is not None:
-        user.birth_date = user_update.birth_date
 
-    if user_update.rank is not None:
-        user.rank = user_update.rank
+def update_user_statement(user_id: int, user_update: UserUpdate, password_hash: str | None = None):
+    """
+    UPDATE ... RETURNING com os campos enviados (não None) e, se informado,
+    o novo hash da senha. Retorna None se não houver nada a alterar.
+    """
+    values = {
+        field: getattr(user_update, field)
+        for field in UPDATABLE_FIELDS
+        if getattr(user_update, field) is not None
+    }
+    if password_hash is not None:
+        values["password_hash"] = password_hash
+    if not values:
+        return None
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(**values)
+        .returning(User)
+        # populate_existing: se o usuário já estiver na sessão, o objeto
+        # devolvido recebe os valores do RETURNING em vez de ficar com os antigos
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def update_user(
+    db: Session,
+    user_id: int,
+    user_update: UserUpdate,
+    password_hash: str | None = None,
+) -> User | None:
+    """
+    Atualiza parcialmente os dados de um usuário em um único UPDATE ... RETURNING.
 
-    # senha será tratada no endpoint, pois precisa de hash
-    # (não mexemos aqui na password_hash)
+    A senha em texto puro de `user_update` é ignorada: o endpoint gera o hash
+    e o passa em `password_hash`. Com senha nova, os refresh tokens do usuário
+    são revogados na mesma transação (como em `async_user_service`).
+    Retorna o usuário atualizado (desanexado da sessão, com os valores do
+    RETURNING) ou None se não encontrado.
+    """
+    stmt = update_user_statement(user_id, user_update, password_hash)
+    if stmt is None:
+        return get_user_by_id(db, user_id)
 
     try:
+        user = db.execute(stmt).scalars().first()
+        if user is not None:
+            if password_hash is not None:
+                db.execute(revoke_user_refresh_tokens_statement(user_id))
+            # Fora da sessão o commit não o expira: ler os atributos depois
+            # não dispara um novo SELECT
+            db.expunge(user)
         db.commit()
     except IntegrityError as e:
         db.rollback()
         # Provavelmente conflito de email/username já existente
         raise ValueError("Email ou username já estão em uso.") from e
 
-    db.refresh(user)
+    if user is not None:
+        token_cache.invalidate_user(user_id)
     return user
 
+
+def delete_user_statement(user_id: int):
+    """
+    DELETE ... RETURNING id do usuário (nenhuma linha se não existir).
+    """
+    return delete(User).where(User.id == user_id).returning(User.id)
+
+
 def delete_user(db: Session, user_id: int) -> bool:
     """
     Deleta um usuário do banco de dados pelo ID.
@@ -127,11 +259,12 @@ def delete_user(db: Session, user_id: int) -> bool:
     Returns:
         True se o usuário foi deletado, False se não foi encontrado
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    # DELETE ... RETURNING: uma única ida ao banco, sem carregar o usuário antes
+    deleted_id = db.execute(delete_user_statement(user_id)).scalar()
+    db.commit()
 
-    if not user:
+    if deleted_id is None:
         return False
 
-    db.delete(user)
-    db.commit()
+    token_cache.invalidate_user(user_id)
     return True
\ No newline at end of file